@@ -0,0 +1,6 @@
+"""Benchmarks for the techtest API.
+
+Each module is a script run from the repository root, for example
+``python -m benchmarks.search --articles 100000``. They build a throwaway
+database, so db.sqlite3 is never touched.
+"""
@@ -0,0 +1,248 @@
+"""Microbenchmarks for every view in techtest/urls.py, through the test client.
+
+    python -m benchmarks.api --articles 10000 --output before.json
+    python -m benchmarks.api --database bench.sqlite3 --repeat 500
+
+Without ``--database`` a throwaway corpus is generated first. Each scenario
+runs in a transaction that is rolled back, so writes never change the data
+the next scenario (or the next run) sees. The response cache is cleared
+before each scenario; detail reads use a different object on every request
+unless the scenario name says ``cached``.
+
+The JSON report holds p50/p99 latency, queries per request and the peak RSS
+reached by the end of each scenario, keyed by scenario name.
+"""
+import argparse
+import json
+import platform
+import random
+import string
+import subprocess
+import time
+
+from benchmarks.common import (
+    REPO_ROOT,
+    benchmark_database,
+    file_database,
+    peak_rss_mb,
+    setup_django,
+    summarize,
+)
+from benchmarks.fixtures import REGIONS, WORDS, create_corpus
+
+
+class QueryCounter(object):
+    """``connection.execute_wrapper`` that only counts, without DEBUG's SQL log."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def scenarios(rng, ids):
+    """``name -> (expected status, request(i) -> (method, url, body)[, max runs])``.
+
+    ``ids`` holds sampled primary keys per entity, the codes of the regions
+    and unused region codes. Deletes carry a third item capping their
+    request count at the number of distinct objects available.
+    """
+    from django.urls import reverse
+
+    def pick(kind):
+        return lambda i: ids[kind][i % len(ids[kind])]
+
+    article, author, region = pick("articles"), pick("authors"), pick("regions")
+
+    def article_body(i):
+        return {
+            "title": " ".join(rng.choice(WORDS) for _ in range(6)),
+            "content": " ".join(rng.choice(WORDS) for _ in range(80)),
+            "author": author(i),
+            "regions": [{"id": region(i)}],
+        }
+
+    def author_body(i):
+        return {"first_name": rng.choice(WORDS).title(), "last_name": rng.choice(WORDS).title()}
+
+    def url(name, **kwargs):
+        return reverse(name, kwargs=kwargs)
+
+    return {
+        "articles_list": (200, lambda i: ("get", url("articles-list"), None)),
+        "articles_list_1000": (200, lambda i: ("get", url("articles-list") + "?limit=1000", None)),
+        "articles_list_by_region": (
+            200,
+            lambda i: ("get", url("articles-list") + "?region=" + REGIONS[i % len(REGIONS)][0], None),
+        ),
+        "articles_search": (
+            200,
+            lambda i: ("get", url("articles-search") + "?q=" + WORDS[i % len(WORDS)], None),
+        ),
+        "article_detail": (200, lambda i: ("get", url("article", article_id=article(i)), None)),
+        "article_detail_cached": (200, lambda i: ("get", url("article", article_id=article(0)), None)),
+        "batch_articles_100": (
+            200,
+            lambda i: (
+                "post",
+                url("batch"),
+                {"articles": [article(i + n) for n in range(100)]},
+            ),
+        ),
+        "article_create": (201, lambda i: ("post", url("articles-list"), article_body(i))),
+        "articles_bulk_create_100": (
+            201,
+            lambda i: ("post", url("articles-bulk"), [article_body(i + n) for n in range(100)]),
+        ),
+        "article_update": (
+            200,
+            lambda i: ("put", url("article", article_id=article(i)), article_body(i)),
+        ),
+        "article_delete": (
+            200,
+            lambda i: ("delete", url("article", article_id=article(i)), None),
+            len(ids["articles"]),
+        ),
+        "authors_list": (200, lambda i: ("get", url("authors-list"), None)),
+        "author_detail": (200, lambda i: ("get", url("author", author_id=author(i)), None)),
+        "author_create": (201, lambda i: ("post", url("authors-list"), author_body(i))),
+        "author_update": (
+            200,
+            lambda i: ("put", url("author", author_id=author(i)), author_body(i)),
+        ),
+        "author_delete": (
+            200,
+            lambda i: ("delete", url("author", author_id=author(i)), None),
+            len(ids["authors"]),
+        ),
+        "regions_list": (200, lambda i: ("get", url("regions-list"), None)),
+        "region_detail": (200, lambda i: ("get", url("region", region_id=region(i)), None)),
+        "region_create": (
+            201,
+            lambda i: ("post", url("regions-list"), {"code": pick("free_codes")(i), "name": "Bench"}),
+        ),
+        "region_update": (
+            200,
+            lambda i: (
+                "put",
+                url("region", region_id=region(i)),
+                {"code": ids["region_codes"][region(i)], "name": rng.choice(WORDS)},
+            ),
+        ),
+        "region_delete": (
+            200,
+            lambda i: ("delete", url("region", region_id=region(i)), None),
+            len(ids["regions"]),
+        ),
+    }
+
+
+def run_scenario(client, expected_status, request, repeat):
+    from django.db import connection, transaction
+    from techtest.cache import response_cache
+
+    response_cache().clear()
+    counter = QueryCounter()
+    timings = []
+    with transaction.atomic(), connection.execute_wrapper(counter):
+        for i in range(repeat):
+            method, url, body = request(i)
+            kwargs = {} if body is None else {
+                "data": json.dumps(body), "content_type": "application/json"
+            }
+            start = time.perf_counter()
+            response = getattr(client, method)(url, **kwargs)
+            if response.streaming:
+                b"".join(response.streaming_content)
+            timings.append(time.perf_counter() - start)
+            if response.status_code != expected_status:
+                raise AssertionError(
+                    f"{method.upper()} {url} returned {response.status_code}: {response.content[:200]}"
+                )
+        transaction.set_rollback(True)
+    return dict(
+        summarize(timings),
+        queries_per_request=round(counter.count / repeat, 2),
+        peak_rss_mb=peak_rss_mb(),
+    )
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database", help="SQLite file made by benchmarks.generate")
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    setup_django()
+    import django
+    from django.test import Client
+    from techtest.articles.models import Article
+    from techtest.authors.models import Author
+    from techtest.regions.models import Region
+
+    if args.database:
+        database = file_database(args.database)
+    else:
+        database = benchmark_database()
+    with database:
+        if not args.database:
+            create_corpus(args.articles, args.authors, seed=args.seed)
+        rng = random.Random(args.seed)
+        ids = {}
+        for kind, model in (("articles", Article), ("authors", Author), ("regions", Region)):
+            pks = list(model.objects.values_list("pk", flat=True))
+            # Distinct objects for as many requests as possible, deletes included
+            ids[kind] = rng.sample(pks, min(len(pks), args.repeat))
+        ids["region_codes"] = dict(Region.objects.values_list("pk", "code"))
+        taken = set(ids["region_codes"].values())
+        alphabet = string.ascii_uppercase + string.digits
+        ids["free_codes"] = [a + b for a in alphabet for b in alphabet if a + b not in taken]
+        client = Client()
+        results = {}
+        for name, (status, request, *runs) in scenarios(rng, ids).items():
+            if args.only and name not in args.only:
+                continue
+            repeat = min([args.repeat] + runs)
+            results[name] = run_scenario(client, status, request, repeat)
+        counts = {kind: model.objects.count() for kind, model in (
+            ("articles", Article), ("authors", Author), ("regions", Region)
+        )}
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "django": django.get_version(),
+        "database": args.database or "generated",
+        "rows": counts,
+        "repeat": args.repeat,
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
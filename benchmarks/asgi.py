@@ -0,0 +1,213 @@
+"""Read throughput of the ASGI entry point against the WSGI one.
+
+    python -m benchmarks.asgi --concurrency 16 --duration 10
+
+Generates one file database, then for each entry point starts a fresh
+process that drives the real application callable in-process for
+``--duration`` seconds with ``--concurrency`` clients issuing a mix of list
+and detail reads:
+
+- ``wsgi``: techtest.settings and ``get_wsgi_application()``, one thread per
+  client, as a threaded WSGI server would run it
+- ``asgi``: techtest.asgi_settings and ``get_asgi_application()``, one task
+  per client on a single event loop, as uvicorn would run it
+
+The report holds requests per second and p50/p99 latency per operation.
+"""
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import REPO_ROOT, summarize
+
+SETTINGS = {"wsgi": "techtest.settings", "asgi": "techtest.asgi_settings"}
+OPERATIONS = ("articles_list", "article_detail", "authors_list", "author_detail")
+WEIGHTS = (0.4, 0.4, 0.1, 0.1)
+
+
+def target(rng, operation, counts):
+    """``(path, query string)`` of one request."""
+    if operation == "articles_list":
+        return "/articles/", "limit=20"
+    if operation == "article_detail":
+        return f"/articles/{rng.randint(1, counts['articles'])}/", ""
+    if operation == "authors_list":
+        return "/authors/", "limit=20"
+    return f"/authors/{rng.randint(1, counts['authors'])}/", ""
+
+
+def wsgi_client(application, seed, counts, deadline, results):
+    from django.db import connection
+
+    rng = random.Random(seed)
+    timings = {operation: [] for operation in OPERATIONS}
+    errors = 0
+    while time.monotonic() < deadline:
+        operation = rng.choices(OPERATIONS, WEIGHTS)[0]
+        path, query = target(rng, operation, counts)
+        environ = {
+            "REQUEST_METHOD": "GET",
+            "PATH_INFO": path,
+            "QUERY_STRING": query,
+            "SERVER_NAME": "testserver",
+            "SERVER_PORT": "80",
+            "SERVER_PROTOCOL": "HTTP/1.1",
+            "wsgi.url_scheme": "http",
+            "wsgi.input": io.BytesIO(),
+            "wsgi.errors": sys.stderr,
+        }
+        statuses = []
+        start = time.perf_counter()
+        body = application(environ, lambda status, headers: statuses.append(status))
+        b"".join(body)
+        body.close()
+        if statuses[0].startswith("200"):
+            timings[operation].append(time.perf_counter() - start)
+        else:
+            errors += 1
+    connection.close()
+    results.append((timings, errors))
+
+
+async def asgi_client(application, seed, counts, deadline):
+    rng = random.Random(seed)
+    timings = {operation: [] for operation in OPERATIONS}
+    errors = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    while time.monotonic() < deadline:
+        operation = rng.choices(OPERATIONS, WEIGHTS)[0]
+        path, query = target(rng, operation, counts)
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "query_string": query.encode(),
+            "headers": [(b"host", b"testserver")],
+            "server": ("testserver", 80),
+            "client": ("127.0.0.1", 0),
+        }
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        start = time.perf_counter()
+        await application(scope, receive, send)
+        if messages[0]["status"] == 200:
+            timings[operation].append(time.perf_counter() - start)
+        else:
+            errors += 1
+    return timings, errors
+
+
+def worker(entry_point, database, concurrency, duration, counts):
+    """Serve ``concurrency`` clients through ``entry_point`` for ``duration`` seconds."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = SETTINGS[entry_point]
+    sys.path.insert(0, REPO_ROOT)
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = database
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    if entry_point == "wsgi":
+        from django.core.wsgi import get_wsgi_application
+
+        application = get_wsgi_application()
+        results = []
+        deadline = time.monotonic() + duration
+        pool = [
+            threading.Thread(
+                target=wsgi_client, args=(application, n, counts, deadline, results)
+            )
+            for n in range(concurrency)
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return results
+
+    from django.core.asgi import get_asgi_application
+
+    application = get_asgi_application()
+
+    async def run():
+        deadline = time.monotonic() + duration
+        return await asyncio.gather(
+            *(asgi_client(application, n, counts, deadline) for n in range(concurrency))
+        )
+
+    return asyncio.run(run())
+
+
+def run_entry_point(entry_point, database, args, counts):
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        results = pool.apply(
+            worker, (entry_point, database, args.concurrency, args.duration, counts)
+        )
+    timings = {operation: [] for operation in OPERATIONS}
+    errors = 0
+    for client_timings, client_errors in results:
+        for operation, values in client_timings.items():
+            timings[operation] += values
+        errors += client_errors
+    completed = sum(len(values) for values in timings.values())
+    return {
+        "requests": completed,
+        "throughput_rps": round(completed / args.duration, 1),
+        "errors": errors,
+        "operations": {
+            operation: summarize(values) for operation, values in timings.items() if values
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per entry point")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        database = os.path.join(directory, "db.sqlite3")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.generate", database,
+             "--articles", str(args.articles), "--authors", str(args.authors)],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        counts = {"articles": args.articles, "authors": args.authors}
+        report = {"concurrency": args.concurrency, "duration_s": args.duration}
+        for entry_point in SETTINGS:
+            report[entry_point] = run_entry_point(entry_point, database, args, counts)
+    finally:
+        shutil.rmtree(directory)
+    report["throughput_ratio"] = round(
+        report["asgi"]["throughput_rps"] / max(report["wsgi"]["throughput_rps"], 0.1), 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
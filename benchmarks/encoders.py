@@ -0,0 +1,55 @@
+"""Time the JSON encoders on a page of the article list.
+
+    python -m benchmarks.encoders --limit 1000
+
+``json.dumps`` is the encoder json_response used before encoders became
+pluggable: default separators, then ``str.encode``.
+"""
+import argparse
+import json
+
+from benchmarks.common import benchmark_database, measure, setup_django, summarize
+from benchmarks.fixtures import create_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=1000, help="articles in the payload")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from techtest.articles.models import Article
+    from techtest.articles.schemas import ArticleSchema
+    from techtest.encoders import orjson, orjson_dumps, stdlib_dumps
+    from techtest.serializers import get_dumper
+
+    encoders = {
+        "json.dumps": lambda data: json.dumps(data).encode(),
+        "stdlib_dumps": stdlib_dumps,
+    }
+    if orjson is not None:
+        encoders["orjson_dumps"] = orjson_dumps
+
+    with benchmark_database():
+        create_corpus(args.articles, args.authors)
+        dumper = get_dumper(ArticleSchema)
+        rows = list(dumper.schema.values_queryset(Article.objects.order_by("pk"))[: args.limit])
+        payload = dumper.dump(dumper.schema.attach_relations(rows), many=True)
+        report = {"articles": len(payload)}
+        for name, encode in encoders.items():
+            assert json.loads(encode(payload)) == payload
+            report[name] = dict(
+                summarize(measure(lambda: encode(payload), args.repeat)),
+                bytes=len(encode(payload)),
+            )
+        baseline = report["json.dumps"]["p50_ms"]
+        for name in encoders:
+            report[name]["speedup_p50"] = round(baseline / report[name]["p50_ms"], 2)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Synthetic data for the benchmarks."""
+import random
+
+WORDS = (
+    "django sqlite python query index cache article region author content "
+    "title search rank snippet cursor page stream export bulk update delete "
+    "create latency throughput memory server worker request response json "
+    "schema field model table column join prefetch select filter order limit"
+).split()
+
+
+def sentence(rng, length):
+    return " ".join(rng.choice(WORDS) for _ in range(length))
+
+
+# Appears in roughly one article in a thousand, for selective searches
+RARE_WORD = "zephyr"
+
+
+def article_content(rng):
+    content = sentence(rng, 80)
+    if rng.random() < 0.001:
+        content += " " + RARE_WORD
+    return content
+
+
+def create_articles(count, author_ids=(), author_ratio=0.8, batch_size=5000, seed=0):
+    """Insert ``count`` articles with random titles and content.
+
+    With ``author_ids``, about ``author_ratio`` of them get a random author.
+    """
+    from techtest.articles.models import Article
+    from techtest.authors.models import Author
+
+    rng = random.Random(seed)
+    author_ids = list(author_ids)
+
+    def author_id():
+        if author_ids and rng.random() < author_ratio:
+            return rng.choice(author_ids)
+        return None
+
+    for start in range(0, count, batch_size):
+        Article.objects.bulk_create(
+            Article(title=sentence(rng, 6), content=article_content(rng), author_id=author_id())
+            for _ in range(min(batch_size, count - start))
+        )
+    # bulk_create skips the signals that keep the stored counts
+    reconcile_counts(Author)
+
+
+REGIONS = [
+    ("AL", "Albania"),
+    ("AU", "Austria"),
+    ("CA", "Canada"),
+    ("DE", "Germany"),
+    ("FR", "France"),
+    ("IT", "Italy"),
+    ("UK", "United Kingdom"),
+    ("US", "United States of America"),
+]
+
+
+def create_authors(count, batch_size=5000, seed=0):
+    from techtest.authors.models import Author
+
+    rng = random.Random(seed)
+    for start in range(0, count, batch_size):
+        Author.objects.bulk_create(
+            Author(first_name=rng.choice(WORDS).title(), last_name=rng.choice(WORDS).title())
+            for _ in range(min(batch_size, count - start))
+        )
+
+
+def create_regions():
+    from techtest.regions.models import Region
+
+    Region.objects.bulk_create(Region(code=code, name=name) for code, name in REGIONS)
+
+
+def link_regions(max_regions=2, batch_size=5000, seed=0):
+    """Link every article to up to ``max_regions`` random regions."""
+    from techtest.articles.models import Article
+    from techtest.regions.models import Region
+
+    rng = random.Random(seed)
+    region_ids = list(Region.objects.values_list("pk", flat=True))
+    if not region_ids:
+        return
+    through = Article.regions.through
+    article_ids = Article.objects.order_by("pk").values_list("pk", flat=True)
+    batch = []
+    for article_id in article_ids.iterator(chunk_size=batch_size):
+        batch += [
+            through(article_id=article_id, region_id=region_id)
+            for region_id in rng.sample(region_ids, rng.randint(0, max_regions))
+        ]
+        if len(batch) >= batch_size:
+            through.objects.bulk_create(batch)
+            batch = []
+    through.objects.bulk_create(batch)
+    reconcile_counts(Region)
+
+
+def reconcile_counts(model, batch_size=5000):
+    """Recompute ``model.article_count`` after bulk loads."""
+    from techtest.articles.counters import reconcile
+
+    for _ in reconcile(model, batch_size):
+        pass
+
+
+def create_corpus(articles, authors, max_regions=2, seed=0):
+    """Regions, authors and articles wired together, ready for the read paths."""
+    from techtest.authors.models import Author
+
+    create_regions()
+    create_authors(authors, seed=seed)
+    create_articles(articles, Author.objects.values_list("pk", flat=True), seed=seed)
+    link_regions(max_regions=max_regions, seed=seed)
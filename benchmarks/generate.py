@@ -0,0 +1,56 @@
+"""Fill an SQLite file with a large synthetic corpus for the API benchmarks.
+
+    python -m benchmarks.generate bench.sqlite3 --articles 1000000 --authors 10000
+
+The file is migrated first and can then be benchmarked with
+``python -m benchmarks.api --database bench.sqlite3``.
+"""
+import argparse
+import json
+import os
+import time
+
+from benchmarks.common import file_database, setup_django
+from benchmarks.fixtures import create_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("database", help="path of the SQLite file to create")
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--authors", type=int, default=10000)
+    parser.add_argument("--max-regions", type=int, default=2, help="region links per article")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replace", action="store_true", help="overwrite an existing file")
+    args = parser.parse_args()
+
+    if os.path.exists(args.database):
+        if not args.replace:
+            parser.error(f"{args.database} exists, pass --replace to overwrite it")
+        os.remove(args.database)
+
+    setup_django()
+    from django.core.management import call_command
+    from django.db import transaction
+    from techtest.articles.models import Article
+
+    start = time.perf_counter()
+    with file_database(os.path.abspath(args.database)):
+        call_command("migrate", verbosity=0)
+        # One transaction: SQLite would otherwise sync to disk after every batch
+        with transaction.atomic():
+            create_corpus(args.articles, args.authors, args.max_regions, args.seed)
+        links = Article.regions.through.objects.count()
+    report = {
+        "database": args.database,
+        "articles": args.articles,
+        "authors": args.authors,
+        "region_links": links,
+        "seconds": round(time.perf_counter() - start, 1),
+        "size_mb": round(os.path.getsize(args.database) / 2 ** 20, 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compare the FTS5 search index with ``icontains`` scans.
+
+    python -m benchmarks.search --articles 100000 --query "zephyr"
+
+The default query is a rare word, which is where a scan hurts most: it has
+to read the whole table to fill a page. Common words (``--query django``)
+show the other end, where FTS5 pays to rank every match.
+"""
+import argparse
+import json
+
+from benchmarks.common import benchmark_database, measure, setup_django, summarize
+from benchmarks.fixtures import RARE_WORD, create_articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--query", default=RARE_WORD)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db.models import Q
+    from techtest.articles.models import Article
+    from techtest.articles.search import search
+
+    with benchmark_database():
+        create_articles(args.articles)
+        terms = args.query.split()
+
+        def fts():
+            return search(args.query, 20)
+
+        def icontains():
+            condition = Q()
+            for term in terms:
+                condition &= Q(title__icontains=term) | Q(content__icontains=term)
+            return list(Article.objects.filter(condition).values_list("pk", flat=True)[:20])
+
+        report = {
+            "articles": args.articles,
+            "query": args.query,
+            "fts5": summarize(measure(fts, args.repeat)),
+            "icontains": summarize(measure(icontains, args.repeat)),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
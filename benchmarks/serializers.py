@@ -0,0 +1,46 @@
+"""Compare marshmallow's ArticleSchema dump with the compiled Dumper.
+
+    python -m benchmarks.serializers --articles 10000
+"""
+import argparse
+import json
+
+from benchmarks.common import benchmark_database, measure, setup_django, summarize
+from benchmarks.fixtures import create_corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from techtest.articles.models import Article
+    from techtest.articles.schemas import ArticleSchema
+    from techtest.serializers import get_dumper
+
+    with benchmark_database():
+        create_corpus(args.articles, args.authors)
+        dumper = get_dumper(ArticleSchema)
+        articles = list(dumper.schema.optimize_queryset(Article.objects.all()))
+        assert json.dumps(dumper.dump(articles, many=True)) == json.dumps(
+            ArticleSchema().dump(articles, many=True)
+        )
+
+        marshmallow = summarize(
+            measure(lambda: ArticleSchema().dump(articles, many=True), args.repeat)
+        )
+        compiled = summarize(measure(lambda: dumper.dump(articles, many=True), args.repeat))
+        report = {
+            "articles": args.articles,
+            "marshmallow": marshmallow,
+            "compiled": compiled,
+            "speedup_p50": round(marshmallow["p50_ms"] / compiled["p50_ms"], 2),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""Throughput of ``manage.py serve`` by worker count, over real HTTP.
+
+    python -m benchmarks.server --workers 1,2,4 --clients 16 --duration 10
+
+Generates one file database, then for each worker count starts gunicorn
+through ``manage.py serve`` on it and drives it for ``--duration`` seconds
+from ``--clients`` client processes, each sending one request per
+connection: article list and article detail reads, half and half. The response cache is shared through
+the file backend, as it should be with several workers.
+
+The report holds requests per second and p50/p99 latency per worker count.
+The clients run on the same machine and take CPU time from the workers, so
+throughput stops scaling before the worker count reaches the core count.
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import REPO_ROOT, summarize
+
+SETTINGS = """
+from techtest.settings import *  # noqa: F401,F403
+
+DATABASES['default']['NAME'] = {database!r}
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1']
+"""
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_listening(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("The server didn't start listening")
+
+
+def client(port, articles, seed, duration):
+    rng = random.Random(seed)
+    deadline = time.monotonic() + duration
+    timings, errors = [], 0
+    while time.monotonic() < deadline:
+        if rng.random() < 0.5:
+            path = "/articles/?limit=20"
+        else:
+            path = f"/articles/{rng.randint(1, articles)}/"
+        start = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        try:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except OSError:
+            ok = False
+        finally:
+            connection.close()
+        if ok:
+            timings.append(time.perf_counter() - start)
+        else:
+            errors += 1
+    return timings, errors
+
+
+def run_workers(workers, directory, args):
+    port = free_port()
+    environment = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE="bench_settings",
+        PYTHONPATH=os.pathsep.join([directory, REPO_ROOT]),
+        TECHTEST_CACHE_DIR=os.path.join(directory, f"cache-{workers}"),
+        TECHTEST_METRICS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "manage.py", "serve", "--workers", str(workers),
+         "--bind", f"127.0.0.1:{port}"],
+        cwd=REPO_ROOT,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_listening(port)
+        with multiprocessing.get_context("spawn").Pool(args.clients) as pool:
+            results = pool.starmap(
+                client, [(port, args.articles, n, args.duration) for n in range(args.clients)]
+            )
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait()
+    timings = [timing for client_timings, _ in results for timing in client_timings]
+    return {
+        "requests": len(timings),
+        "throughput_rps": round(len(timings) / args.duration, 1),
+        "errors": sum(errors for _, errors in results),
+        "latency": summarize(timings) if timings else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument(
+        "--workers",
+        default=",".join(str(2 ** n) for n in range((os.cpu_count() or 1).bit_length())),
+        help="comma-separated worker counts (default: powers of two up to the CPU count)",
+    )
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per worker count")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        database = os.path.join(directory, "db.sqlite3")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.generate", database,
+             "--articles", str(args.articles), "--authors", str(args.authors)],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        with open(os.path.join(directory, "bench_settings.py"), "w") as settings_file:
+            settings_file.write(SETTINGS.format(database=database))
+        report = {
+            "cpus": os.cpu_count(),
+            "clients": args.clients,
+            "duration_s": args.duration,
+            "workers": {
+                workers: run_workers(int(workers), directory, args)
+                for workers in args.workers.split(",")
+            },
+        }
+    finally:
+        shutil.rmtree(directory)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
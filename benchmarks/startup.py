@@ -0,0 +1,165 @@
+"""Cold start and per-request overhead of the full and the API-only settings.
+
+    python -m benchmarks.startup --runs 5 --requests 2000
+
+Generates one file database, then for each settings profile:
+
+- ``full``: techtest.settings, with the admin, auth, sessions and messages
+  apps and their middleware
+- ``api``: techtest.api_settings, API apps only, four middleware and views
+  imported on first use (techtest/api_urls.py)
+
+measures ``--runs`` fresh interpreters that load ``techtest.wsgi`` and serve
+one article list request (median wall time of each step, modules loaded),
+one more under ``python -X importtime`` (total import time), and then the
+p50/p99 latency of ``--requests`` requests per operation served by one
+process through the WSGI callable, after a warm-up.
+"""
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import REPO_ROOT, summarize
+
+PROFILES = {"full": "techtest.settings", "api": "techtest.api_settings"}
+# A cached detail read does next to no work of its own, so the middleware
+# stands out; the list read is a typical request
+OPERATIONS = {"author_detail_cached": ("/authors/1/", ""), "articles_list": ("/articles/", "limit=20")}
+
+COLD_START = """
+import json, sys, time
+start = time.perf_counter()
+from django.conf import settings
+settings.DATABASES["default"]["NAME"] = sys.argv[1]
+settings.ALLOWED_HOSTS = ["testserver"]
+import techtest.wsgi
+loaded = time.perf_counter()
+from benchmarks.startup import wsgi_get
+assert wsgi_get(techtest.wsgi.application, "/articles/", "limit=20") == 200
+served = time.perf_counter()
+print(json.dumps({"load_s": loaded - start, "first_request_s": served - loaded,
+                  "modules": len(sys.modules)}))
+"""
+
+
+def wsgi_get(application, path, query):
+    """Serve one GET through ``application`` and return the status code."""
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SERVER_NAME": "testserver",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "wsgi.url_scheme": "http",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+    }
+    statuses = []
+    body = application(environ, lambda status, headers: statuses.append(status))
+    b"".join(body)
+    body.close()
+    return int(statuses[0].split()[0])
+
+
+def cold_start(settings_module, database, importtime=False):
+    environment = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    command = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    result = subprocess.run(
+        command + ["-c", COLD_START, database],
+        cwd=REPO_ROOT,
+        env=environment,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    return json.loads(result.stdout), result.stderr
+
+
+def import_time_ms(stderr):
+    """Total self time of the modules listed by ``-X importtime``."""
+    total = 0
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            self_us = line.split(":", 1)[1].split("|")[0].strip()
+            if self_us.isdigit():
+                total += int(self_us)
+    return round(total / 1000, 1)
+
+
+def request_worker(settings_module, database, requests):
+    """p50/p99 of ``requests`` warm requests per operation in this process."""
+    os.environ["DJANGO_SETTINGS_MODULE"] = settings_module
+    sys.path.insert(0, REPO_ROOT)
+    from django.conf import settings
+
+    settings.DATABASES["default"]["NAME"] = database
+    settings.DEBUG = False
+    settings.ALLOWED_HOSTS = ["testserver"]
+    from django.core.wsgi import get_wsgi_application
+
+    application = get_wsgi_application()
+    report = {"middleware": len(settings.MIDDLEWARE)}
+    for operation, (path, query) in OPERATIONS.items():
+        for _ in range(50):
+            assert wsgi_get(application, path, query) == 200
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            wsgi_get(application, path, query)
+            timings.append(time.perf_counter() - start)
+        report[operation] = summarize(timings)
+    return report
+
+
+def run_profile(settings_module, database, args):
+    runs = [cold_start(settings_module, database)[0] for _ in range(args.runs)]
+    _, stderr = cold_start(settings_module, database, importtime=True)
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        requests = pool.apply(request_worker, (settings_module, database, args.requests))
+    return {
+        "load_ms": round(statistics.median(run["load_s"] for run in runs) * 1000, 1),
+        "first_request_ms": round(
+            statistics.median(run["first_request_s"] for run in runs) * 1000, 1
+        ),
+        "modules": runs[0]["modules"],
+        "import_time_ms": import_time_ms(stderr),
+        "requests": requests,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--authors", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=5, help="cold starts per profile")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per operation")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        database = os.path.join(directory, "db.sqlite3")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.generate", database,
+             "--articles", str(args.articles), "--authors", str(args.authors)],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        report = {name: run_profile(module, database, args) for name, module in PROFILES.items()}
+    finally:
+        shutil.rmtree(directory)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
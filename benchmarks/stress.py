@@ -0,0 +1,186 @@
+"""Concurrent read/write stress test of the article endpoints on a file database.
+
+    python -m benchmarks.stress --processes 4 --threads 4 --duration 10
+
+Runs the same mixed workload (list, detail, update, create) twice against
+copies of one generated database: once with Django's stock SQLite setup
+(rollback journal, deferred transactions, a connection per request) and
+once with the project's settings (techtest/backends/sqlite3: WAL, pragmas,
+IMMEDIATE transactions, persistent connections). Each process serves
+requests from several threads through the test client, as a threaded WSGI
+server would.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.common import REPO_ROOT, setup_django, summarize
+
+PROFILES = {
+    "stock": {"ENGINE": "django.db.backends.sqlite3", "CONN_MAX_AGE": 0, "OPTIONS": {}},
+    "tuned": {},
+}
+OPERATIONS = ("list", "detail", "update", "create")
+
+
+def workload(write_share):
+    """Weights of OPERATIONS: reads 3:1 list to detail, writes 3:1 update to create."""
+    reads = 1 - write_share
+    return (reads * 0.75, reads * 0.25, write_share * 0.75, write_share * 0.25)
+
+
+def request(client, rng, operation, max_id):
+    article_id = rng.randint(1, max_id)
+    if operation == "list":
+        return client.get("/articles/", {"limit": 20})
+    if operation == "detail":
+        return client.get(f"/articles/{article_id}/")
+    body = {"title": f"Stress {rng.random()}", "content": "stress test"}
+    if operation == "update":
+        return client.put(f"/articles/{article_id}/", body, content_type="application/json")
+    return client.post("/articles/", body, content_type="application/json")
+
+
+def serve(seed, weights, max_id, deadline, results):
+    from django.db import connection
+    from django.test import Client
+
+    client = Client()
+    rng = random.Random(seed)
+    timings = {operation: [] for operation in OPERATIONS}
+    errors = {}
+    while time.monotonic() < deadline:
+        operation = rng.choices(OPERATIONS, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = request(client, rng, operation, max_id)
+            error = None if response.status_code < 500 else f"HTTP {response.status_code}"
+        except Exception as e:
+            error = "database is locked" if "locked" in str(e) else type(e).__name__
+        if error:
+            errors[error] = errors.get(error, 0) + 1
+        else:
+            timings[operation].append(time.perf_counter() - start)
+    connection.close()
+    results.append((timings, errors))
+
+
+def worker(profile, database, threads, weights, duration, max_id, seed):
+    """One server process: ``threads`` clients hammering the API for ``duration`` seconds."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "techtest.settings")
+    from django.conf import settings
+
+    settings.DATABASES["default"].update(PROFILES[profile], NAME=database)
+    setup_django()
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment(debug=False)
+    results = []
+    deadline = time.monotonic() + duration
+    pool = [
+        threading.Thread(
+            target=serve, args=(seed * 1000 + n, weights, max_id, deadline, results)
+        )
+        for n in range(threads)
+    ]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return results
+
+
+def run_profile(profile, template, args, max_id):
+    directory = tempfile.mkdtemp()
+    try:
+        database = os.path.join(directory, "db.sqlite3")
+        shutil.copy(template, database)
+        if profile == "stock":
+            # journal_mode is stored in the file; put it back to the default
+            with sqlite3.connect(database) as conn:
+                conn.execute("PRAGMA journal_mode = DELETE")
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.processes) as pool:
+            per_process = pool.starmap(
+                worker,
+                [
+                    (
+                        profile,
+                        database,
+                        args.threads,
+                        workload(args.write_share),
+                        args.duration,
+                        max_id,
+                        n,
+                    )
+                    for n in range(args.processes)
+                ],
+            )
+    finally:
+        shutil.rmtree(directory)
+    timings = {operation: [] for operation in OPERATIONS}
+    errors = {}
+    for results in per_process:
+        for thread_timings, thread_errors in results:
+            for operation, values in thread_timings.items():
+                timings[operation] += values
+            for error, count in thread_errors.items():
+                errors[error] = errors.get(error, 0) + count
+    completed = sum(len(values) for values in timings.values())
+    return {
+        "requests": completed,
+        "throughput_rps": round(completed / args.duration, 1),
+        "errors": errors,
+        "operations": {
+            operation: summarize(values) for operation, values in timings.items() if values
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per profile")
+    parser.add_argument("--write-share", type=float, default=0.2, help="fraction of writes")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    try:
+        template = os.path.join(directory, "template.sqlite3")
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.generate", template,
+             "--articles", str(args.articles), "--authors", str(args.authors)],
+            cwd=REPO_ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        report = {
+            "processes": args.processes,
+            "threads": args.threads,
+            "duration_s": args.duration,
+            "write_share": args.write_share,
+        }
+        for profile in PROFILES:
+            report[profile] = run_profile(profile, template, args, args.articles)
+    finally:
+        shutil.rmtree(directory)
+    report["throughput_ratio"] = round(
+        report["tuned"]["throughput_rps"] / max(report["stock"]["throughput_rps"], 0.1), 2
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the list views' .values() read path with building model instances.
+
+    python -m benchmarks.values --articles 10000
+
+Both paths fetch and serialize the same rows with the compiled dumpers; the
+report gives the per-row cost of each.
+"""
+import argparse
+import json
+
+from benchmarks.common import benchmark_database, measure, setup_django, summarize
+from benchmarks.fixtures import create_corpus
+
+
+def per_row(summary, rows):
+    return dict(summary, p50_us_per_row=round(summary["p50_ms"] * 1000 / rows, 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--authors", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from techtest.articles.models import Article
+    from techtest.articles.schemas import ArticleSchema
+    from techtest.authors.models import Author
+    from techtest.authors.schemas import AuthorSchema
+    from techtest.serializers import get_dumper
+    from techtest.utils import dumped_values, only_dumped_fields
+
+    articles = get_dumper(ArticleSchema)
+    authors = get_dumper(AuthorSchema)
+    paths = {
+        "articles": {
+            "instances": lambda: articles.dump(
+                list(articles.schema.optimize_queryset(Article.objects.order_by("pk"))),
+                many=True,
+            ),
+            "values": lambda: articles.dump(
+                articles.schema.attach_relations(
+                    list(articles.schema.values_queryset(Article.objects.order_by("pk")))
+                ),
+                many=True,
+            ),
+        },
+        "authors": {
+            "instances": lambda: authors.dump(
+                list(only_dumped_fields(Author.objects.order_by("pk"), authors.schema)),
+                many=True,
+            ),
+            "values": lambda: authors.dump(
+                list(dumped_values(Author.objects.order_by("pk"), authors.schema)), many=True
+            ),
+        },
+    }
+
+    report = {}
+    with benchmark_database():
+        create_corpus(args.articles, args.authors)
+        counts = {"articles": args.articles, "authors": args.authors}
+        for name, funcs in paths.items():
+            assert json.dumps(funcs["instances"]()) == json.dumps(funcs["values"]())
+            results = {
+                path: per_row(summarize(measure(func, args.repeat)), counts[name])
+                for path, func in funcs.items()
+            }
+            results["speedup_p50"] = round(
+                results["instances"]["p50_ms"] / results["values"]["p50_ms"], 2
+            )
+            report[name] = dict(results, rows=counts[name])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Settings for API-only workers.
+
+The same as techtest/settings.py without what only the admin needs: the
+admin, auth, sessions, messages and staticfiles apps (whose imports slow
+down every cold start) and the session, authentication, message and
+clickjacking middleware (which run on every request). Routes come from
+techtest/api_urls.py, which imports each app's views on first use.
+
+    DJANGO_SETTINGS_MODULE=techtest.api_settings python manage.py runserver
+
+Without AuthenticationMiddleware there are no staff users, so request
+profiling needs the token. ``python -m benchmarks.startup`` compares both
+profiles.
+"""
+from techtest.settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'techtest.articles',
+    'techtest.regions',
+    'techtest.authors',
+    'techtest.changes',
+]
+
+MIDDLEWARE = [
+    'techtest.metrics.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'techtest.profiling.ProfilingMiddleware',
+]
+
+ROOT_URLCONF = 'techtest.api_urls'
+
+# Nothing renders templates
+TEMPLATES = []
@@ -0,0 +1,49 @@
+"""URLs for API-only workers (techtest/api_settings.py).
+
+The same routes and names as techtest/urls.py minus the admin. Each view is
+named by its dotted path and imported on the first request that needs it,
+so a worker only loads the schemas and views of the endpoints it serves.
+"""
+from django.urls import path
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path):
+    """A view function for the class-based view at ``dotted_path``."""
+    resolved = []
+
+    def view(request, *args, **kwargs):
+        if not resolved:
+            # Racing threads may both get here; the import is idempotent
+            resolved.append(import_string(dotted_path).as_view())
+        return resolved[0](request, *args, **kwargs)
+
+    view.__name__ = dotted_path.rpartition(".")[2]
+    return view
+
+
+urlpatterns = [
+    path("articles/", lazy_view("techtest.articles.views.ArticlesListView"), name="articles-list"),
+    path(
+        "articles/search/",
+        lazy_view("techtest.articles.views.ArticlesSearchView"),
+        name="articles-search",
+    ),
+    path(
+        "articles/bulk/",
+        lazy_view("techtest.articles.views.ArticlesBulkView"),
+        name="articles-bulk",
+    ),
+    path(
+        "articles/<int:article_id>/",
+        lazy_view("techtest.articles.views.ArticleView"),
+        name="article",
+    ),
+    path("regions/", lazy_view("techtest.regions.views.RegionsListView"), name="regions-list"),
+    path("regions/<int:region_id>/", lazy_view("techtest.regions.views.RegionView"), name="region"),
+    path("authors/", lazy_view("techtest.authors.views.AuthorsListView"), name="authors-list"),
+    path("authors/<int:author_id>/", lazy_view("techtest.authors.views.AuthorView"), name="author"),
+    path("batch/", lazy_view("techtest.batch.BatchView"), name="batch"),
+    path("changes/", lazy_view("techtest.changes.views.ChangesView"), name="changes"),
+    path("metrics", lazy_view("techtest.metrics.MetricsView"), name="metrics"),
+]
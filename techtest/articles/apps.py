@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ArticlesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'techtest.articles'
+
+    def ready(self):
+        from techtest.articles import signals  # noqa: F401
@@ -0,0 +1,67 @@
+"""Async versions of the article list and detail views, for the ASGI entry point.
+
+Reads are served here with the ORM work offloaded to the database threads;
+the author and region lookups of a page run concurrently. Writes are
+handed to the sync views in techtest/articles/views.py, and NDJSON exports
+are refused (see ``ASYNC_EXPORT_ERROR``).
+"""
+import asyncio
+
+from marshmallow import ValidationError
+
+from techtest.articles.models import Article
+from techtest.articles.schemas import ArticleFilterSchema, ArticleSchema
+from techtest.articles.views import ArticlesListView, ArticleView
+from techtest.asyncdb import database_sync_to_async, sync_view
+from techtest.cache import cache_response
+from techtest.conditional import conditional_get, object_version, table_version
+from techtest.pagination import ASYNC_EXPORT_ERROR
+from techtest.serializers import get_dumper
+from techtest.utils import json_response, requested_fields
+
+
+async def attach_relations(schema, rows):
+    """``ArticleSchema.attach_relations`` with its queries run concurrently."""
+    queries = schema.relation_queries(rows)
+    results = await asyncio.gather(
+        *(database_sync_to_async(fetch)(argument) for fetch, argument in queries.values())
+    )
+    return schema.stitch_relations(rows, **dict(zip(queries, results)))
+
+
+@conditional_get(table_version(Article))
+async def articles_list(request):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(ArticlesListView)(request)
+    paginator = ArticlesListView()
+    if paginator.wants_export(request):
+        return json_response(ASYNC_EXPORT_ERROR, 400)
+    filter_schema = ArticleFilterSchema()
+    try:
+        serializer = get_dumper(ArticleSchema, requested_fields(request, ArticleSchema))
+        filters = filter_schema.load(request.GET)
+        queryset = serializer.schema.values_queryset(
+            filter_schema.filter_queryset(Article.objects.all(), filters)
+        )
+        articles = await database_sync_to_async(paginator.paginate_queryset)(request, queryset)
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    await attach_relations(serializer.schema, articles)
+    return paginator.paginated_response(request, serializer.dump(articles, many=True))
+
+
+@cache_response(Article, "article_id")
+@conditional_get(object_version(Article, "article_id"))
+async def article_detail(request, article_id):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(ArticleView)(request, article_id=article_id)
+    try:
+        serializer = get_dumper(ArticleSchema, requested_fields(request, ArticleSchema))
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    queryset = serializer.schema.values_queryset(Article.objects.filter(pk=article_id))
+    articles = await database_sync_to_async(list)(queryset)
+    if not articles:
+        return json_response({"error": "No Article matches the given query"}, 404)
+    await attach_relations(serializer.schema, articles)
+    return json_response(serializer.dump(articles[0]))
@@ -0,0 +1,110 @@
+"""Stored article counts on authors and regions.
+
+``Author.article_count`` and ``Region.article_count`` are adjusted in the
+same transaction as the article writes that change them: the signal
+handlers in techtest/articles/signals.py cover saves, deletes and region
+link changes, and ``bulk_save_articles`` applies the deltas of a whole
+batch itself (inside ``bulk_counting()``, which silences the handlers).
+``python manage.py reconcile_counters`` recomputes them in batches should
+they ever drift, e.g. after raw SQL or ``bulk_create`` writes. A drifted
+count never fails a write: decrements stop at 0 and the correction is left
+to ``reconcile_counters``.
+
+A count change is a change of the author or region as served by the API,
+so it bumps ``updated_at``, evicts the cached response and is logged in the
+change feed too. Every article write thus also writes its author's row and
+the rows of the regions it gains or loses.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from techtest.articles.models import Article
+from techtest.authors.models import Author
+from techtest.cache import invalidate
+from techtest.changes.log import record
+from techtest.changes.models import Change
+
+bulk_counting_active = ContextVar("bulk_counting_active", default=False)
+
+
+@contextmanager
+def bulk_counting():
+    """Leave the counters of the writes in the block to the caller."""
+    token = bulk_counting_active.set(True)
+    try:
+        yield
+    finally:
+        bulk_counting_active.reset(token)
+
+
+def adjust(model, deltas):
+    """Add ``deltas`` (``{pk: change}``) to the ``article_count`` of ``model`` rows,
+    with one UPDATE per distinct change. Counts never go below 0."""
+    by_change = {}
+    for pk, change in deltas.items():
+        if pk is not None and change:
+            by_change.setdefault(change, []).append(pk)
+    if not by_change:
+        return
+    now = timezone.now()
+    for change, pks in by_change.items():
+        model.objects.filter(pk__in=pks).update(
+            article_count=Greatest(F("article_count") + change, 0), updated_at=now
+        )
+    changed = [pk for pks in by_change.values() for pk in pks]
+    invalidate(model, changed)
+    record(model, changed, Change.UPDATE)
+
+
+def author_deltas(changes):
+    """``{author_id: change}`` for ``(old author_id, new author_id)`` pairs;
+    None stands for no author, or no article on the old side."""
+    deltas = Counter()
+    for old, new in changes:
+        if old != new:
+            deltas[old] -= 1
+            deltas[new] += 1
+    return deltas
+
+
+def linked_regions(article_ids):
+    """Region ids linked to the given articles, one entry per link."""
+    return Article.regions.through.objects.filter(article_id__in=article_ids).values_list(
+        "region_id", flat=True
+    )
+
+
+def actual_counts(model, pks):
+    if model is Author:
+        rows = Article.objects.filter(author_id__in=pks).values_list("author_id")
+    else:
+        rows = Article.regions.through.objects.filter(region_id__in=pks).values_list(
+            "region_id"
+        )
+    return dict(rows.annotate(count=Count("pk")).order_by())
+
+
+def reconcile(model, batch_size=1000):
+    """Recompute ``model.article_count`` in batches of ``batch_size`` rows, each in
+    its own transaction, and yield ``(checked, fixed)`` per batch."""
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            stored = dict(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", "article_count")[:batch_size]
+            )
+            if not stored:
+                return
+            actual = actual_counts(model, list(stored))
+            deltas = {pk: actual.get(pk, 0) - count for pk, count in stored.items()}
+            adjust(model, deltas)
+        yield len(stored), sum(1 for change in deltas.values() if change)
+        last_pk = max(stored)
@@ -0,0 +1,50 @@
+import pstats
+from io import StringIO
+
+from django.core.management.base import BaseCommand, CommandError
+
+from techtest.profiling import load_profile, profile_ids, profile_path
+
+
+class Command(BaseCommand):
+    help = "List the recent request profiles, or summarize one of them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("profile_id", nargs="?", help="profile to summarize")
+        parser.add_argument(
+            "--limit", type=int, default=20, help="profiles to list, or functions to show"
+        )
+        parser.add_argument(
+            "--sort", default="cumulative", help="pstats sort key for the summary"
+        )
+
+    def handle(self, *args, **options):
+        if options["profile_id"]:
+            self.summarize(options["profile_id"], options["sort"], options["limit"])
+        else:
+            self.list(options["limit"])
+
+    def list(self, limit):
+        newest = profile_ids()[::-1][:limit]
+        if not newest:
+            self.stdout.write("No profiles recorded.")
+            return
+        for profile_id in newest:
+            profile = load_profile(profile_id)
+            self.stdout.write(
+                "{id}  {duration_ms:>10.1f} ms  {status}  {method} {path}".format(**profile)
+            )
+
+    def summarize(self, profile_id, sort, limit):
+        if profile_id not in profile_ids():
+            raise CommandError(f"No profile {profile_id}.")
+        profile = load_profile(profile_id)
+        self.stdout.write(
+            "{method} {path} -> {status} in {duration_ms} ms (view: {view})".format(**profile)
+        )
+        self.stdout.write(f"Flame graph input: {profile_path(profile_id, '.collapsed')}")
+        # pstats prints in fragments, which OutputWrapper would each end with a newline
+        buffer = StringIO()
+        stats = pstats.Stats(profile_path(profile_id, ".prof"), stream=buffer)
+        stats.strip_dirs().sort_stats(sort).print_stats(limit)
+        self.stdout.write(buffer.getvalue())
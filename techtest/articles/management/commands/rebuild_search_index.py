@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from techtest.articles.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index from the articles table."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} articles."))
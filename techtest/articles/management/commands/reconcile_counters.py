@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from techtest.articles.counters import reconcile
+from techtest.authors.models import Author
+from techtest.regions.models import Region
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored article counts of authors and regions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="rows per transaction"
+        )
+
+    def handle(self, *args, **options):
+        for model in (Author, Region):
+            checked = fixed = 0
+            for batch_checked, batch_fixed in reconcile(model, options["batch_size"]):
+                checked += batch_checked
+                fixed += batch_fixed
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{model._meta.verbose_name_plural}: checked {checked}, fixed {fixed}."
+                )
+            )
@@ -0,0 +1,136 @@
+"""``manage.py serve``: gunicorn running ``WSGI_APPLICATION`` for production.
+
+The master loads the application (techtest.wsgi, which also warms the
+region cache) and its URLconf before forking the workers, so they share the
+loaded code and data copy-on-write. Each worker serves ``--threads``
+requests at once. With ``--threads 1`` (gunicorn's sync worker) a request
+holds its worker until it is answered, so requests carry
+``BLOCKING_WORKER`` and the change feed caps long polls at
+``CHANGES_BLOCKING_MAX_WAIT``.
+
+Signals to the master are gunicorn's: ``HUP`` starts new workers and stops
+the old ones gracefully (new code needs a full restart, since they fork
+from the same preloaded master), ``TERM`` shuts down gracefully, ``INT``
+and ``QUIT`` at once.
+"""
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import get_internal_wsgi_application
+from django.db import connections
+from django.urls import get_resolver
+from gunicorn.app.base import BaseApplication
+
+from techtest.metrics import clear_multiprocess_dir, mark_process_dead, multiprocess_dir
+from techtest.workers import blocking
+
+
+class Server(BaseApplication):
+    """gunicorn configured from a dict of its settings instead of its command line."""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for name, value in self.options.items():
+            self.cfg.set(name, value)
+
+    def load(self):
+        application = get_internal_wsgi_application()
+        # Import the URLconf (and with it, eagerly routed views) up front too
+        get_resolver().url_patterns
+        connections.close_all()
+        return blocking(application) if self.cfg.threads == 1 else application
+
+
+def on_starting(server):
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    mark_process_dead(worker.pid)
+
+
+class Command(BaseCommand):
+    help = "Serve the application with gunicorn, from a pre-forked pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bind", default="127.0.0.1:8000", help="host:port to listen on")
+        parser.add_argument(
+            "--workers", type=int, default=os.cpu_count() or 1, help="worker processes"
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="requests each worker serves at once (1: gunicorn's sync worker)",
+        )
+        parser.add_argument(
+            "--max-requests",
+            type=int,
+            default=0,
+            help="restart a worker after this many requests (0: never)",
+        )
+        parser.add_argument(
+            "--max-requests-jitter",
+            type=int,
+            default=0,
+            help="add up to this many requests to each worker's limit",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=int,
+            default=30,
+            help="seconds workers get to finish their requests on restart and shutdown",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=int,
+            default=30,
+            help="restart workers that stay silent for this many seconds",
+        )
+        parser.add_argument("--access-log", action="store_true", help="log every request")
+
+    def handle(self, *args, **options):
+        local = [
+            alias
+            for alias, cache in settings.CACHES.items()
+            if cache["BACKEND"] == "django.core.cache.backends.locmem.LocMemCache"
+        ]
+        if options["workers"] > 1 and local:
+            regions = ""
+            if settings.REGION_CACHE_ALIAS in local:
+                regions = (
+                    f" and take up to {settings.REGION_CACHE_MAX_AGE} seconds "
+                    "(REGION_CACHE_MAX_AGE) to see their region writes"
+                )
+            self.stderr.write(
+                self.style.WARNING(
+                    f"Caches {', '.join(local)} are per process, so workers won't see each "
+                    f"other's evictions{regions}: set TECHTEST_CACHE_DIR to share them."
+                )
+            )
+        if options["workers"] > 1 and settings.METRICS_ENABLED and not multiprocess_dir():
+            self.stderr.write(
+                self.style.WARNING(
+                    "Metrics are per process, so /metrics reports whichever worker answers "
+                    "the scrape: set PROMETHEUS_MULTIPROC_DIR to sum them."
+                )
+            )
+        Server(
+            {
+                "bind": options["bind"],
+                "workers": options["workers"],
+                "threads": options["threads"],
+                "max_requests": options["max_requests"],
+                "max_requests_jitter": options["max_requests_jitter"],
+                "graceful_timeout": options["graceful_timeout"],
+                "timeout": options["timeout"],
+                "accesslog": "-" if options["access_log"] else None,
+                "preload_app": True,
+                "on_starting": on_starting,
+                "child_exit": child_exit,
+            }
+        ).run()
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+# External-content FTS5 index over Article.title/content. The triggers keep it
+# in step with every write, including bulk and raw ones that skip signals.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE articles_article_fts USING fts5(
+        title, content, content='articles_article', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER articles_article_fts_insert AFTER INSERT ON articles_article BEGIN
+        INSERT INTO articles_article_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_article_fts_delete AFTER DELETE ON articles_article BEGIN
+        INSERT INTO articles_article_fts(articles_article_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER articles_article_fts_update AFTER UPDATE OF title, content
+    ON articles_article BEGIN
+        INSERT INTO articles_article_fts(articles_article_fts, rowid, title, content)
+        VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO articles_article_fts(rowid, title, content)
+        VALUES (new.id, new.title, new.content);
+    END
+    """,
+    "INSERT INTO articles_article_fts(articles_article_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS articles_article_fts_update",
+    "DROP TRIGGER IF EXISTS articles_article_fts_delete",
+    "DROP TRIGGER IF EXISTS articles_article_fts_insert",
+    "DROP TABLE IF EXISTS articles_article_fts",
+]
+
+
+def run_on_sqlite(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0003_add_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_on_sqlite(CREATE_SQL), run_on_sqlite(DROP_SQL)),
+    ]
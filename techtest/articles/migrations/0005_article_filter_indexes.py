@@ -0,0 +1,24 @@
+# Generated by Django 3.2.7 on 2026-10-17 03:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('articles', '0004_article_search_index'),
+    ]
+
+    operations = [
+        # The auto-created through table only indexes (article_id, region_id)
+        # for uniqueness; region filters walk it from the region side.
+        migrations.RunSQL(
+            'CREATE INDEX "articles_article_regions_region_article_idx" '
+            'ON "articles_article_regions" ("region_id", "article_id")',
+            'DROP INDEX "articles_article_regions_region_article_idx"',
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['title'], name='article_title_idx'),
+        ),
+    ]
@@ -1,13 +1,33 @@
+import sys
+from collections import Counter
+
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
 from marshmallow import validate
 from marshmallow import fields
+from marshmallow import EXCLUDE
 from marshmallow import Schema
-from marshmallow.decorators import post_load, post_dump
+from marshmallow import ValidationError
+from marshmallow.decorators import post_load, pre_load, validates
 
+from techtest.articles.counters import (
+    adjust,
+    author_deltas,
+    bulk_counting,
+    linked_regions,
+)
 from techtest.articles.models import Article
+from techtest.regions.cache import region_cache
 from techtest.regions.models import Region
-from techtest.regions.schemas import RegionSchema, RegionLiteSchema
+from techtest.regions.schemas import RegionSchema, RegionLiteSchema, RegionReferenceSchema
 from techtest.authors.models import Author
-from techtest.authors.schemas import AuthorSchema
+from techtest.authors.schemas import AuthorLiteSchema
+from techtest.cache import invalidate
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.serializers import get_dumper, get_schema
+from techtest.utils import dumped_values, only_dumped_fields
 
 
 class ArticleSchema(Schema):
@@ -26,75 +46,432 @@ class ArticleSchema(Schema):
         required=False, serialize="get_regions", deserialize="load_regions"
     )
 
+    def optimize_queryset(self, queryset):
+        """Select only the columns, and join or prefetch only the relations, this
+        schema instance will serialize."""
+        queryset = only_dumped_fields(queryset, self)
+        if "author" in self.dump_fields:
+            queryset = queryset.select_related("author")
+        if "regions" in self.dump_fields:
+            queryset = queryset.prefetch_related("regions")
+        return queryset
+
+    def values_queryset(self, queryset):
+        """``.values()`` rows for the list views, to be completed by ``attach_relations``."""
+        extra = ("author_id",) if "author" in self.dump_fields else ()
+        return dumped_values(queryset, self, *extra)
+
+    def attach_relations(self, rows):
+        """Stitch authors and regions onto ``.values()`` rows.
+
+        Each relation is one query whose rows are matched up by id in Python,
+        so no model instances are built along the way.
+        """
+        lookups = {
+            name: fetch(argument) for name, (fetch, argument) in self.relation_queries(rows).items()
+        }
+        return self.stitch_relations(rows, **lookups)
+
+    def relation_queries(self, rows):
+        """``{name: (fetch, argument)}`` for each relation the rows need.
+
+        The queries don't depend on each other, so async callers can run them
+        concurrently before handing the results to ``stitch_relations``.
+        """
+        queries = {}
+        if not rows:
+            return queries
+        if "author" in self.dump_fields:
+            author_ids = {row["author_id"] for row in rows if row["author_id"] is not None}
+            queries["authors"] = (self.authors_by_id, author_ids)
+        if "regions" in self.dump_fields:
+            queries["regions"] = (self.regions_by_article, [row["id"] for row in rows])
+        return queries
+
+    def authors_by_id(self, author_ids):
+        if not author_ids:
+            return {}
+        queryset = Author.objects.filter(pk__in=author_ids)
+        return {author["id"]: author for author in dumped_values(queryset, get_schema(AuthorLiteSchema))}
+
+    def regions_by_article(self, article_ids):
+        # Only the link table is read; the regions themselves come from the cache
+        names = list(get_schema(RegionLiteSchema).dump_fields)
+        rows = region_cache.rows_by_id()
+        links = list(
+            Article.regions.through.objects.filter(article_id__in=article_ids).values_list(
+                "article_id", "region_id"
+            )
+        )
+        unknown = {region_id for _, region_id in links if region_id not in rows}
+        if unknown:
+            # Created by another process whose write this one hasn't heard of
+            rows = dict(rows)
+            rows.update((row["id"], row) for row in Region.objects.filter(pk__in=unknown).values())
+        regions = {}
+        for article_id, region_id in links:
+            region = rows[region_id]
+            regions.setdefault(article_id, []).append({name: region[name] for name in names})
+        return regions
+
+    def stitch_relations(self, rows, authors=None, regions=None):
+        if authors is not None:
+            for row in rows:
+                row["author"] = authors.get(row["author_id"])
+        if regions is not None:
+            for row in rows:
+                row["regions"] = regions.get(row["id"], [])
+        return rows
+
     def get_author(self, article):
+        if isinstance(article, dict):
+            author = article["author"]
+            return author and get_dumper(AuthorLiteSchema).dump(author)
         if article.author:
-            return AuthorSchema().dump(article.author)
+            return get_dumper(AuthorLiteSchema).dump(article.author)
         return None
 
-    def load_author(self, author):
-        """Convert author from various formats (None, ID, dict, etc.) to Author instance."""
+    def load_author(self, author, current=None):
+        """Convert author from various formats (None, ID, dict, etc.) to Author instance.
+
+        ``current`` is the article's present author; referencing it again is
+        resolved without a query.
+        """
         # Handle None/null explicitly
         if author is None or author == "null":
             return None
         # Handle string or integer ID (e.g., "1" or 1)
         if isinstance(author, (str, int)):
             try:
+                if current is not None and current.pk == int(author):
+                    return current
                 return Author.objects.get(pk=int(author))
             except (Author.DoesNotExist, ValueError):
                 return None
         if isinstance(author, dict):
             author_id = author.get("id", None)
             if author_id:
+                if current is not None and str(current.pk) == str(author_id):
+                    return current
                 try:
                     return Author.objects.get(pk=author_id)
                 except Author.DoesNotExist:
                     # If author doesn't exist, create new one with provided data
                     author_data = {k: v for k, v in author.items() if k != "id"}
-                    return Author.objects.create(**author_data)
+                    return self.create_author(author_data)
             # Create new author if no id provided
-            return Author.objects.create(**author)
+            return self.create_author(author)
         # Already an Author instance
         return author
-    
-    @post_dump
-    def serialize_author(self, data, **kwargs):
-        """Serialize author field using AuthorSchema."""
-        # During dump, the author will be an Author instance from the model
-        # fields.Raw passes it through as-is, so we serialize it here
-        if "author" in data:
-            if data["author"] is None:
-                data["author"] = None
-            elif hasattr(data["author"], "id"):
-                # It's an Author instance, serialize it
-                data["author"] = AuthorSchema().dump(data["author"])
-        return data
 
+    @staticmethod
+    def create_author(data):
+        author = Author.objects.create(**data)
+        record(Author, [author.pk], Change.CREATE)
+        return author
+    
     def get_regions(self, article):
-        # return RegionSchema().dump(article.regions.all(), many=True)
-        return RegionLiteSchema().dump(article.regions.all(), many=True)
+        # Read prefetched regions straight from the prefetch cache: building
+        # the article.regions manager costs more than dumping the regions
+        if isinstance(article, dict):
+            regions = article["regions"]
+        else:
+            regions = getattr(article, "_prefetched_objects_cache", {}).get("regions")
+        if regions is None:
+            regions = self.regions_by_article([article.pk]).get(article.pk, [])
+        return get_dumper(RegionLiteSchema).dump(regions, many=True)
 
     def load_regions(self, regions):
-        return [
-            Region.objects.get_or_create(id=region.pop("id", None), defaults=region)[0]
-            for region in regions
-        ]
+        """Resolve region references by id, or by code, from the region cache;
+        references the cache doesn't know are looked up or created."""
+        resolved = []
+        snapshot = region_cache.snapshot()
+        for region in regions:
+            region_id = region.pop("id", None)
+            if region_id is not None:
+                cached = snapshot.get(region_id)
+            else:
+                cached = region.get("code") and snapshot.get_by_code(region["code"])
+            if cached:
+                resolved.append(cached)
+            else:
+                region, created = Region.objects.get_or_create(id=region_id, defaults=region)
+                if created:
+                    record(Region, [region.pk], Change.CREATE)
+                resolved.append(region)
+        return resolved
 
     @post_load
+    @transaction.atomic(savepoint=False)
     def update_or_create(self, data, *args, **kwargs):
+        """Create the article, or write only the columns that actually changed.
+
+        Views that already hold the article pass it as ``context["article"]``
+        so it isn't fetched again. Runs in one transaction, together with the
+        article count updates its signals make and the change feed entry,
+        which also stands for the region links changed here.
+        """
         # Check if author was provided before popping (to distinguish between not provided and None)
         # Use _author_raw which is the raw field, or check both
         author_provided = "_author_raw" in data or "author" in data
         author_value = data.pop("_author_raw", None) or data.pop("author", None) if author_provided else None
-        # Convert author value to Author instance (or None)
-        author = self.load_author(author_value) if author_provided else None
         regions = data.pop("regions", None)
-        article, _ = Article.objects.update_or_create(
-            id=data.pop("id", None), defaults=data
-        )
-         # Set author only if it was provided in the input (can be None to remove the relationship)
+        article_id = data.pop("id", None)
+        article = self.context.get("article")
+        if article is None and article_id is not None:
+            article = Article.objects.select_related("author").filter(pk=article_id).first()
+        # Set author only if it was provided in the input (can be None to remove the relationship)
         if author_provided:
-            article.author = author
-            article.save()
-        if isinstance(regions, list):
-            article.regions.set(regions)
+            data["author"] = self.load_author(
+                author_value, current=article.author if article else None
+            )
+        created = article is None
+        if created:
+            article = Article.objects.create(id=article_id, **data)
+            record(Article, [article.pk], Change.CREATE)
+            article._change_recorded = True
+        else:
+            changed = [name for name, value in data.items() if getattr(article, name) != value]
+            for name in changed:
+                setattr(article, name, data[name])
+            if changed:
+                article.save(update_fields=changed + ["updated_at"])
+                record(Article, [article.pk], Change.UPDATE)
+                article._change_recorded = True
+        try:
+            if isinstance(regions, list):
+                # A new article has no links to diff against, which set() would
+                # read through the regions table
+                if created:
+                    article.regions.add(*regions)
+                else:
+                    article.regions.set(regions)
+        finally:
+            article.__dict__.pop("_change_recorded", None)
         return article
+
+
+class ArticleFilterSchema(Schema):
+    """Query parameters that narrow the article list.
+
+    Every filter is served by an index: ``author`` by the author_id foreign
+    key index, ``region`` by the (region_id, article_id) through-table index,
+    ``title__startswith`` by the title index (as a case-sensitive range scan)
+    and ``ids`` by the primary key.
+    """
+
+    class Meta(object):
+        unknown = EXCLUDE
+
+    author = fields.Integer()
+    region = fields.List(fields.String(validate=validate.Length(equal=2)))
+    title__startswith = fields.String(validate=validate.Length(min=1, max=255))
+    ids = fields.List(fields.Integer(), validate=validate.Length(max=1000))
+
+    @pre_load
+    def split_lists(self, params, **kwargs):
+        """Accept both repeated (``?region=AL&region=UK``) and comma-separated lists."""
+        data = {key: params.get(key) for key in ("author", "title__startswith") if key in params}
+        for key in ("region", "ids"):
+            if key in params:
+                data[key] = [
+                    value for values in params.getlist(key) for value in values.split(",") if value
+                ]
+        return data
+
+    def filter_queryset(self, queryset, filters):
+        if "author" in filters:
+            queryset = queryset.filter(author_id=filters["author"])
+        if filters.get("region"):
+            links = Article.regions.through.objects.filter(region__code__in=filters["region"])
+            queryset = queryset.filter(pk__in=links.values("article_id"))
+        if "title__startswith" in filters:
+            # LIKE can't use the index on SQLite, a range over it can
+            prefix = filters["title__startswith"]
+            queryset = queryset.filter(title__gte=prefix)
+            if ord(prefix[-1]) < sys.maxunicode:
+                queryset = queryset.filter(title__lt=prefix[:-1] + chr(ord(prefix[-1]) + 1))
+        if "ids" in filters:
+            queryset = queryset.filter(pk__in=filters["ids"])
+        return queryset
+
+
+class ArticleBulkSchema(ArticleSchema):
+    """Validates the items of a bulk payload without writing anything.
+
+    Author and region references are only checked for shape here; they are
+    resolved for the whole batch at once by ``bulk_save_articles``.
+    """
+
+    regions = fields.List(fields.Nested(RegionReferenceSchema), required=False)
+
+    @staticmethod
+    def parse_author_id(author):
+        if isinstance(author, dict):
+            # New authors can't be created in bulk; without an id the
+            # reference would silently turn into no author
+            if author.get("id") is None:
+                raise ValueError("author object without an id")
+            author = author["id"]
+        if author is None or author == "null":
+            return None
+        return int(author)
+
+    @validates("_author_raw")
+    def validate_author(self, author):
+        try:
+            self.parse_author_id(author)
+        except (TypeError, ValueError):
+            raise ValidationError("Must be an author id, an object with an id, or null.")
+
+    @post_load
+    def update_or_create(self, data, *args, **kwargs):
+        # Writes are batched for the whole payload by bulk_save_articles
+        if "_author_raw" in data:
+            data["author_id"] = self.parse_author_id(data.pop("_author_raw"))
+        return data
+
+
+def bulk_insert(model, objs):
+    """bulk_create, or one INSERT per row on backends that can't return new pks."""
+    if connection.features.can_return_rows_from_bulk_insert:
+        return model.objects.bulk_create(objs)
+    for obj in objs:
+        obj.save(force_insert=True)
+    return objs
+
+
+def bulk_save_articles(items):
+    """Create or update a batch of ArticleBulkSchema-loaded items.
+
+    Authors, regions and existing articles are each looked up with a single
+    query, and the writes go out as bulk inserts/updates plus one rewrite of
+    the region links, all in one transaction. Unresolvable references are
+    raised as a ValidationError keyed by item index before anything is
+    written. Returns the article ids in input order.
+    """
+    article_ids = [item["id"] for item in items if item.get("id") is not None]
+    author_ids = {item["author_id"] for item in items if item.get("author_id")}
+    references = [region for item in items for region in item.get("regions", [])]
+    region_ids = {region["id"] for region in references if region.get("id") is not None}
+    region_codes = {
+        region["code"]: region.get("name", "")
+        for region in references
+        if region.get("id") is None
+    }
+
+    existing = Article.objects.in_bulk(article_ids)
+    authors = Author.objects.in_bulk(author_ids)
+    regions_by_id, regions_by_code = {}, {}
+    snapshot = region_cache.snapshot()
+    for region in [snapshot.get(pk) for pk in region_ids] + [
+        snapshot.get_by_code(code) for code in region_codes
+    ]:
+        if region is not None:
+            regions_by_id[region.pk] = region
+            regions_by_code[region.code] = region
+    # Regions this process hasn't cached yet, if any, and new codes
+    unresolved_ids = region_ids.difference(regions_by_id)
+    unresolved_codes = set(region_codes).difference(regions_by_code)
+    if unresolved_ids or unresolved_codes:
+        queryset = Region.objects.filter(Q(pk__in=unresolved_ids) | Q(code__in=unresolved_codes))
+        for region in queryset:
+            regions_by_id[region.pk] = region
+            regions_by_code[region.code] = region
+
+    errors = {}
+    seen = set()
+    for index, item in enumerate(items):
+        item_errors = {}
+        if item.get("id") is not None:
+            if item["id"] in seen:
+                item_errors["id"] = ["Duplicate article id in batch."]
+            seen.add(item["id"])
+        if item.get("author_id") and item["author_id"] not in authors:
+            item_errors["author"] = ["Author does not exist."]
+        missing = {
+            position: {"id": ["Region does not exist."]}
+            for position, region in enumerate(item.get("regions", []))
+            if region.get("id") is not None and region["id"] not in regions_by_id
+        }
+        if missing:
+            item_errors["regions"] = missing
+        if item_errors:
+            errors[index] = item_errors
+    if errors:
+        raise ValidationError(errors)
+
+    with transaction.atomic():
+        new_regions = [
+            Region(code=code, name=name)
+            for code, name in region_codes.items()
+            if code not in regions_by_code
+        ]
+        for region in bulk_insert(Region, new_regions):
+            regions_by_code[region.code] = region
+        if new_regions:
+            # bulk_create skips the signals that keep the region cache current
+            region_cache.invalidate()
+            record(Region, [region.pk for region in new_regions], Change.CREATE)
+
+        fields_to_update = set()
+        to_create, to_update, articles = [], [], []
+        author_changes = []
+        for item in items:
+            values = {
+                name: item[name]
+                for name in ("title", "content", "author_id")
+                if name in item
+            }
+            article = existing.get(item.get("id"))
+            if article is None:
+                article = Article(id=item.get("id"), **values)
+                to_create.append(article)
+                author_changes.append((None, article.author_id))
+            else:
+                previous = article.author_id
+                author_changes.append((previous, values.get("author_id", previous)))
+                for name, value in values.items():
+                    setattr(article, name, value)
+                fields_to_update.update(values)
+                to_update.append(article)
+            articles.append(article)
+        with bulk_counting():
+            bulk_insert(Article, to_create)
+        if to_update:
+            # bulk_update skips auto_now, and relinked regions count as a change
+            now = timezone.now()
+            for article in to_update:
+                article.updated_at = now
+            Article.objects.bulk_update(to_update, sorted(fields_to_update) + ["updated_at"])
+
+        through = Article.regions.through
+        links = []
+        relinked = []
+        for article, item in zip(articles, items):
+            if "regions" not in item:
+                continue
+            relinked.append(article.pk)
+            linked = set()
+            for region in item["regions"]:
+                region = (
+                    regions_by_id[region["id"]]
+                    if region.get("id") is not None
+                    else regions_by_code[region["code"]]
+                )
+                if region.pk not in linked:
+                    linked.add(region.pk)
+                    links.append(through(article_id=article.pk, region_id=region.pk))
+        region_deltas = Counter(link.region_id for link in links)
+        if relinked:
+            region_deltas.subtract(linked_regions(relinked))
+            through.objects.filter(article_id__in=relinked).delete()
+            through.objects.bulk_create(links)
+        # Signals don't see bulk writes, so the counts are adjusted here
+        adjust(Author, author_deltas(author_changes))
+        adjust(Region, region_deltas)
+        # Bulk writes bypass the model signals that normally evict these
+        invalidate(Article, [article.pk for article in articles])
+        record(Article, [article.pk for article in to_create], Change.CREATE)
+        record(Article, [article.pk for article in to_update], Change.UPDATE)
+    return [article.pk for article in articles]
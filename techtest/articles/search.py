@@ -0,0 +1,67 @@
+"""Full-text search over article titles and content, backed by SQLite FTS5.
+
+The ``articles_article_fts`` index is created and kept in sync by triggers in
+migration 0004; ``rebuild_index`` repopulates it from scratch. Migrations
+that make SQLite rebuild ``articles_article`` (most AlterField/AddField
+operations) drop those triggers and must recreate them.
+"""
+from django.db import connection
+
+# Title matches weigh more than content matches in the BM25 ranking
+TITLE_WEIGHT = 10.0
+CONTENT_WEIGHT = 1.0
+
+SEARCH_SQL = """
+    SELECT id, rank, snippet FROM (
+        SELECT rowid AS id,
+               bm25(articles_article_fts, %s, %s) AS rank,
+               snippet(articles_article_fts, -1, '<mark>', '</mark>', '…', 16) AS snippet
+        FROM articles_article_fts
+        WHERE articles_article_fts MATCH %s
+    )
+    {where}
+    ORDER BY rank, id
+    LIMIT %s
+"""
+
+
+def to_match_expression(query):
+    """Quote each term so user input can't trip FTS5 query syntax.
+
+    Terms are ANDed together; a trailing ``*`` keeps its prefix-match meaning.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*")
+        if term:
+            terms.append('"{}"{}'.format(term.replace('"', '""'), "*" if prefix else ""))
+    return " ".join(terms)
+
+
+def search(query, limit, after=None):
+    """Return ``(id, rank, snippet)`` rows best match first.
+
+    ``after`` is the ``(rank, id)`` of the last row already seen, for keyset
+    pagination over the ranked results.
+    """
+    expression = to_match_expression(query)
+    if not expression:
+        return []
+    params = [TITLE_WEIGHT, CONTENT_WEIGHT, expression]
+    where = ""
+    if after is not None:
+        where = "WHERE rank > %s OR (rank = %s AND id > %s)"
+        params += [after[0], after[0], after[1]]
+    with connection.cursor() as cursor:
+        cursor.execute(SEARCH_SQL.format(where=where), params + [limit])
+        return cursor.fetchall()
+
+
+def rebuild_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO articles_article_fts(articles_article_fts) VALUES ('rebuild')"
+        )
+        cursor.execute("SELECT COUNT(*) FROM articles_article_fts")
+        return cursor.fetchone()[0]
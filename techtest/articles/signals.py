@@ -0,0 +1,165 @@
+"""Keep article versions, cached responses and article counts in step.
+
+An article response embeds its author and its regions, so edits to either
+(and changes to the region links) bump ``updated_at`` on, and evict the cached
+response of, every article that shows them, and log an update of each in
+the change feed. Article saves, deletes and link changes also adjust the
+stored counts of techtest/articles/counters.py.
+"""
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from techtest.articles.counters import (
+    adjust,
+    author_deltas,
+    bulk_counting_active,
+    linked_regions,
+)
+from techtest.articles.models import Article
+from techtest.authors.models import Author
+from techtest.cache import invalidate
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.regions.models import Region
+
+
+def articles_by_author(author_pk):
+    return Article.objects.filter(author_id=author_pk).values_list("pk", flat=True)
+
+
+def articles_in_region(region_pk):
+    return Article.regions.through.objects.filter(region_id=region_pk).values_list(
+        "article_id", flat=True
+    )
+
+
+def touch(article_pks, log=True):
+    article_pks = list(article_pks)
+    if article_pks:
+        Article.objects.filter(pk__in=article_pks).update(updated_at=timezone.now())
+        invalidate(Article, article_pks)
+        if log:
+            record(Article, article_pks, Change.UPDATE)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+def invalidate_article(sender, instance, **kwargs):
+    invalidate(Article, [instance.pk])
+
+
+@receiver(m2m_changed, sender=Article.regions.through)
+def touch_article_regions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            # ArticleSchema.update_or_create has already logged this write
+            touch([instance.pk], log=not instance.__dict__.get("_change_recorded"))
+    elif action == "pre_clear":
+        instance._linked_article_pks = list(articles_in_region(instance.pk))
+    elif action == "post_clear":
+        touch(instance.__dict__.pop("_linked_article_pks", []))
+    elif action in ("post_add", "post_remove"):
+        touch(pk_set)
+
+
+@receiver(post_save, sender=Author)
+def touch_author_articles(sender, instance, created, **kwargs):
+    if not created:
+        touch(articles_by_author(instance.pk))
+
+
+@receiver(post_save, sender=Region)
+def touch_region_articles(sender, instance, created, **kwargs):
+    if not created:
+        touch(articles_in_region(instance.pk))
+
+
+# Deleting an author nulls, and deleting a region unlinks, its articles
+# without any Article signal, so collect them before the rows go away.
+@receiver(pre_delete, sender=Author)
+def collect_author_articles(sender, instance, **kwargs):
+    instance._linked_article_pks = list(articles_by_author(instance.pk))
+
+
+@receiver(pre_delete, sender=Region)
+def collect_region_articles(sender, instance, **kwargs):
+    instance._linked_article_pks = list(articles_in_region(instance.pk))
+
+
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Region)
+def touch_deleted_relation_articles(sender, instance, **kwargs):
+    touch(instance.__dict__.pop("_linked_article_pks", []))
+
+
+def saves_author(update_fields):
+    return update_fields is None or bool({"author", "author_id"} & set(update_fields))
+
+
+@receiver(pre_save, sender=Article)
+def remember_previous_author(sender, instance, raw, update_fields, **kwargs):
+    if raw or bulk_counting_active.get() or not saves_author(update_fields):
+        return
+    if instance.pk is None:
+        previous = None
+    elif not instance._state.adding and "_loaded_author_id" in instance.__dict__:
+        previous = instance._loaded_author_id
+    else:
+        # Deferred author, or an instance built by hand for an existing row
+        previous = Article.objects.filter(pk=instance.pk).values_list("author_id", flat=True).first()
+    instance._previous_author_id = previous
+
+
+@receiver(post_save, sender=Article)
+def count_author_articles(sender, instance, raw, update_fields, **kwargs):
+    if raw or bulk_counting_active.get() or not saves_author(update_fields):
+        return
+    previous = instance.__dict__.pop("_previous_author_id", None)
+    adjust(Author, author_deltas([(previous, instance.author_id)]))
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(pre_delete, sender=Article)
+def collect_counted_relations(sender, instance, **kwargs):
+    # The link rows go with the article, without any m2m_changed signal
+    instance._counted_relations = (
+        instance.author_id,
+        dict.fromkeys(linked_regions([instance.pk]), -1),
+    )
+
+
+@receiver(post_delete, sender=Article)
+def uncount_deleted_article(sender, instance, **kwargs):
+    author_id, region_deltas = instance.__dict__.pop("_counted_relations", (None, {}))
+    adjust(Author, {author_id: -1})
+    adjust(Region, region_deltas)
+
+
+@receiver(m2m_changed, sender=Article.regions.through)
+def count_region_links(sender, instance, action, reverse, pk_set, **kwargs):
+    through = Article.regions.through
+    if action == "post_add":
+        # pk_set only holds the links that were actually missing
+        adjust(Region, {instance.pk: len(pk_set)} if reverse else dict.fromkeys(pk_set, 1))
+    elif action in ("pre_remove", "pre_clear"):
+        # pk_set may name objects that aren't linked, so count the real links
+        if reverse:
+            links = through.objects.filter(region_id=instance.pk)
+            if action == "pre_remove":
+                links = links.filter(article_id__in=pk_set)
+            deltas = {instance.pk: -links.count()}
+        else:
+            links = through.objects.filter(article_id=instance.pk)
+            if action == "pre_remove":
+                links = links.filter(region_id__in=pk_set)
+            deltas = dict.fromkeys(links.values_list("region_id", flat=True), -1)
+        instance._region_count_deltas = deltas
+    elif action in ("post_remove", "post_clear"):
+        adjust(Region, instance.__dict__.pop("_region_count_deltas", {}))
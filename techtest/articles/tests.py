@@ -1,11 +1,28 @@
 import json
+import time
+from io import StringIO
+from unittest import mock
+from urllib.parse import urlencode
 
-from django.test import TestCase
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils.http import http_date
 
 from techtest.articles.models import Article
+from techtest.articles.schemas import ArticleFilterSchema, ArticleSchema
+from techtest.articles.views import ArticlesListView
+from techtest.regions.cache import region_cache
 from techtest.regions.models import Region
 from techtest.authors.models import Author
+from techtest.authors.schemas import AuthorSchema
+from techtest.cache import cache_key, response_cache
+from techtest.pagination import ASYNC_EXPORT_ERROR
+from techtest.serializers import get_dumper, get_schema
 
 
 class ArticleListViewTestCase(TestCase):
@@ -66,6 +83,64 @@ class ArticleListViewTestCase(TestCase):
             ],
         )
 
+    def test_runs_constant_number_of_queries_regardless_of_row_count(self):
+        # The ETag validator aggregate, the articles, their authors and
+        # their region links; the regions come from the warmed region cache
+        region_cache.snapshot()
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        for i in range(10):
+            article = Article.objects.create(
+                title=f"Bulk Article {i}", author=self.author
+            )
+            article.regions.set([self.region_1, self.region_2])
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.json()), 13)
+
+    def test_paginates_with_cursor_and_next_link(self):
+        response = self.client.get(self.url, {"limit": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [article["id"] for article in response.json()],
+            [self.article_1.id, self.article_2.id],
+        )
+        next_url = response["Link"].split(";")[0].strip("<>")
+        self.assertIn("limit=2", next_url)
+        response = self.client.get(next_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [article["id"] for article in response.json()], [self.article_3.id]
+        )
+        self.assertFalse(response.has_header("Link"))
+
+    def test_rejects_invalid_pagination_parameters(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cursor", response.json())
+        response = self.client.get(self.url, {"limit": "zero"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("limit", response.json())
+
+    def test_streams_ndjson_export_in_chunks(self):
+        region_cache.snapshot()
+        with mock.patch.object(ArticlesListView, "export_chunk_size", 2):
+            response = self.client.get(self.url, {"format": "ndjson"})
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.streaming)
+            self.assertEqual(response["Content-Type"], "application/x-ndjson")
+            # Articles and region links for each of the two chunks, plus authors
+            # for the second, the only one with an authored article
+            with self.assertNumQueries(5):
+                lines = b"".join(response.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual(
+            [row["id"] for row in rows],
+            [self.article_1.id, self.article_2.id, self.article_3.id],
+        )
+        self.assertEqual(rows[2]["author"]["id"], self.author.id)
+        self.assertEqual(len(rows[1]["regions"]), 2)
+
     def test_creates_new_article_with_regions(self):
         payload = {
             "title": "Fake Article 3",
@@ -196,6 +271,14 @@ class ArticleViewTestCase(TestCase):
             },
         )
 
+    def test_serializes_single_record_with_author_and_regions_in_three_queries(self):
+        self.article.author = Author.objects.create(first_name="Jane", last_name="Smith")
+        self.article.save()
+        # The ETag validator, the article joined with its author, and the regions
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.json()["author"]["first_name"], "Jane")
+
     def test_updates_article_and_regions(self):
         # Change regions
         payload = {
@@ -359,7 +442,657 @@ class ArticleViewTestCase(TestCase):
         self.assertEqual(article.author.id, author2.id)
         self.assertEqual(response.json()["author"]["id"], author2.id)
 
+    def test_skips_the_write_when_nothing_changed(self):
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.article.author = author
+        self.article.save()
+        payload = {"title": "Fake Article 1", "content": "", "author": author.id}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        writes = [q["sql"] for q in queries if q["sql"].startswith(("UPDATE", "INSERT"))]
+        self.assertEqual(writes, [])
+        # Fetching the article (joined with its author) and its regions
+        self.assertEqual(len(queries), 2)
+
+    def test_writes_only_changed_columns_in_a_single_update(self):
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        payload = {"title": "Fake Article 1", "content": "New content", "author": author.id}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.put(
+                self.url, data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 200)
+        updates = [q["sql"] for q in queries if q["sql"].startswith('UPDATE "articles_article"')]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"content"', updates[0])
+        self.assertIn('"author_id"', updates[0])
+        self.assertNotIn('"title"', updates[0])
+        article = Article.objects.get(pk=self.article.pk)
+        self.assertEqual(article.content, "New content")
+        self.assertEqual(article.author_id, author.id)
+
     def test_removes_article(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Article.objects.count(), 0)
+
+
+class ArticleBulkViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-bulk")
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1")
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def test_creates_and_updates_articles_in_one_request(self):
+        payload = [
+            {
+                "title": "New Article",
+                "content": "Bulk loaded",
+                "author": self.author.id,
+                "regions": [{"code": "AL"}, {"code": "US", "name": "United States"}],
+            },
+            {
+                "id": self.article.id,
+                "title": "Fake Article 1 (Modified)",
+                "regions": [{"id": self.region.id}],
+            },
+        ]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 201)
+        created, updated = response.json()
+        self.assertEqual(created["author"]["id"], self.author.id)
+        self.assertCountEqual(
+            created["regions"],
+            [
+                {"code": "AL", "name": "Albania"},
+                {"code": "US", "name": "United States"},
+            ],
+        )
+        self.assertEqual(updated["id"], self.article.id)
+        self.assertEqual(updated["title"], "Fake Article 1 (Modified)")
+        self.assertEqual(updated["regions"], [{"code": "AL", "name": "Albania"}])
+        self.assertEqual(Article.objects.count(), 2)
+        self.assertEqual(Region.objects.count(), 2)
+
+    def test_reports_errors_by_index_and_writes_nothing(self):
+        payload = [
+            {"title": "Valid Article"},
+            {"title": "Unknown Author", "author": 9999},
+            {"title": "Unknown Region", "regions": [{"code": "AL"}, {"id": 9999}]},
+            {"title": "x" * 256},
+        ]
+        response = self.post(payload)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("3", response.json())
+        # Shape errors are caught before references are resolved
+        response = self.post(payload[:3])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {
+                "1": {"author": ["Author does not exist."]},
+                "2": {"regions": {"1": {"id": ["Region does not exist."]}}},
+            },
+        )
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_rejects_author_objects_without_an_id(self):
+        response = self.post([{"title": "New Author", "author": {"first_name": "Jane"}}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(),
+            {"0": {"author": ["Must be an author id, an object with an id, or null."]}},
+        )
+        self.assertEqual(Article.objects.count(), 1)
+        self.assertEqual(Author.objects.count(), 1)
+
+    def test_updates_run_a_constant_number_of_queries(self):
+        def update_payload(articles):
+            return [
+                {"id": article.id, "title": "Updated", "regions": [{"code": "AL"}]}
+                for article in articles
+            ]
+
+        articles = [Article.objects.create(title=f"Article {i}") for i in range(10)]
+        region_cache.snapshot()
+        with CaptureQueriesContext(connection) as small_batch:
+            self.assertEqual(self.post(update_payload(articles[:2])).status_code, 201)
+        with CaptureQueriesContext(connection) as large_batch:
+            self.assertEqual(self.post(update_payload(articles)).status_code, 201)
+        self.assertEqual(len(small_batch), len(large_batch))
+        self.assertEqual(
+            Article.objects.filter(title="Updated", regions=self.region).count(), 10
+        )
+
+
+class ArticleResponseCacheTestCase(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.article.regions.set([self.region])
+        self.url = reverse("article", kwargs={"article_id": self.article.id})
+
+    def test_serves_repeat_reads_from_cache(self):
+        first = self.client.get(self.url)
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.content, second.content)
+
+    def test_bypasses_cache_for_requests_with_parameters(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(3):
+            self.client.get(self.url, {"unused": "1"})
+
+    def test_article_update_evicts_cached_response(self):
+        self.client.get(self.url)
+        self.client.put(
+            self.url,
+            data=json.dumps({"title": "Fake Article 1 (Modified)"}),
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(self.url).json()["title"], "Fake Article 1 (Modified)")
+
+    def test_author_edit_evicts_embedding_articles(self):
+        self.client.get(self.url)
+        self.author.first_name = "Jane"
+        self.author.save()
+        self.assertEqual(self.client.get(self.url).json()["author"]["first_name"], "Jane")
+        self.author.delete()
+        self.assertIsNone(self.client.get(self.url).json()["author"])
+
+    def test_region_changes_evict_embedding_articles(self):
+        self.client.get(self.url)
+        self.region.name = "Republic of Albania"
+        self.region.save()
+        self.assertEqual(
+            self.client.get(self.url).json()["regions"],
+            [{"code": "AL", "name": "Republic of Albania"}],
+        )
+        self.region.articles.clear()
+        self.assertEqual(self.client.get(self.url).json()["regions"], [])
+
+    def test_deleted_article_is_not_served_from_cache(self):
+        self.client.get(self.url)
+        self.client.delete(self.url)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_bulk_update_evicts_cached_response(self):
+        self.client.get(self.url)
+        self.client.post(
+            reverse("articles-bulk"),
+            data=json.dumps([{"id": self.article.id, "title": "Bulk Title"}]),
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(self.url).json()["title"], "Bulk Title")
+
+
+class ArticleConditionalGetTestCase(TestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.url = reverse("article", kwargs={"article_id": self.article.id})
+        self.list_url = reverse("articles-list")
+
+    def test_answers_if_none_match_with_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        response_cache().clear()
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        # A cached response answers without touching the database
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_answers_if_modified_since_with_not_modified(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_embedded_changes_produce_a_new_etag(self):
+        etags = [self.client.get(self.url)["ETag"]]
+        self.author.first_name = "Jane"
+        self.author.save()
+        etags.append(self.client.get(self.url)["ETag"])
+        self.article.regions.add(self.region)
+        etags.append(self.client.get(self.url)["ETag"])
+        self.region.delete()
+        etags.append(self.client.get(self.url)["ETag"])
+        self.assertEqual(len(set(etags)), 4)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_is_validated_with_a_single_aggregate_query(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        # Pages and other parameters are validated separately
+        response = self.client.get(self.list_url, {"limit": 1}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        Article.objects.create(title="Fake Article 2").delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.article.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_is_not_validated_by_date_after_a_delete(self):
+        newer = Article.objects.create(title="Fake Article 2")
+        response = self.client.get(self.list_url)
+        self.assertNotIn("Last-Modified", response)
+        # Leaves Max(updated_at) as it was
+        self.article.delete()
+        since = http_date(time.time() + 60)
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([article["id"] for article in response.json()], [newer.id])
+
+
+class ArticleSearchViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-search")
+        self.in_title = Article.objects.create(
+            title="Django performance tuning", content="Notes on the ORM."
+        )
+        self.in_content = Article.objects.create(
+            title="Weekly notes", content="A short piece about Django and SQLite."
+        )
+        self.unrelated = Article.objects.create(title="Gardening", content="Tomatoes.")
+
+    def test_ranks_title_matches_first_and_highlights_snippets(self):
+        response = self.client.get(self.url, {"q": "django"})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertEqual(
+            [result["id"] for result in results],
+            [self.in_title.id, self.in_content.id],
+        )
+        self.assertIn("<mark>Django</mark>", results[0]["snippet"])
+        self.assertEqual(results[1]["title"], "Weekly notes")
+
+    def test_index_follows_updates_and_deletes(self):
+        self.unrelated.title = "Django in the garden"
+        self.unrelated.save()
+        self.in_title.delete()
+        response = self.client.get(self.url, {"q": "django"})
+        self.assertCountEqual(
+            [result["id"] for result in response.json()],
+            [self.in_content.id, self.unrelated.id],
+        )
+        response = self.client.get(self.url, {"q": "tomatoes"})
+        self.assertEqual(response.json()[0]["id"], self.unrelated.id)
+
+    def test_paginates_ranked_results_with_cursor(self):
+        response = self.client.get(self.url, {"q": "django", "limit": 1})
+        self.assertEqual([result["id"] for result in response.json()], [self.in_title.id])
+        next_url = response["Link"].split(";")[0].strip("<>")
+        response = self.client.get(next_url)
+        self.assertEqual([result["id"] for result in response.json()], [self.in_content.id])
+        self.assertFalse(response.has_header("Link"))
+
+    def test_handles_prefixes_and_query_syntax_characters(self):
+        response = self.client.get(self.url, {"q": "perf*"})
+        self.assertEqual([result["id"] for result in response.json()], [self.in_title.id])
+        response = self.client.get(self.url, {"q": 'django" OR ("'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_requires_a_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("q", response.json())
+
+    def test_rebuild_command_reindexes_articles(self):
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("Indexed 3 articles", out.getvalue())
+        self.assertEqual(len(self.client.get(self.url, {"q": "django"}).json()), 2)
+
+
+class ArticleListFilterTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("articles-list")
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region_1 = Region.objects.create(code="AL", name="Albania")
+        self.region_2 = Region.objects.create(code="UK", name="United Kingdom")
+        self.article_1 = Article.objects.create(title="Django tips", author=self.author)
+        self.article_1.regions.set([self.region_1])
+        self.article_2 = Article.objects.create(title="django notes")
+        self.article_2.regions.set([self.region_1, self.region_2])
+        self.article_3 = Article.objects.create(title="SQLite tips")
+
+    def ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [article["id"] for article in response.json()]
+
+    def plan(self, params):
+        filter_schema = ArticleFilterSchema()
+        queryset = filter_schema.filter_queryset(
+            ArticleSchema().optimize_queryset(Article.objects.all()),
+            filter_schema.load(QueryDict(params)),
+        )
+        return queryset.order_by("pk")[:100].explain()
+
+    def test_filters_by_author(self):
+        self.assertEqual(self.ids({"author": self.author.id}), [self.article_1.id])
+
+    def test_filters_by_one_or_more_region_codes(self):
+        self.assertEqual(self.ids({"region": "UK"}), [self.article_2.id])
+        self.assertEqual(self.ids({"region": ["AL", "UK"]}), [self.article_1.id, self.article_2.id])
+        self.assertEqual(self.ids({"region": "AL,UK"}), [self.article_1.id, self.article_2.id])
+
+    def test_filters_by_case_sensitive_title_prefix(self):
+        self.assertEqual(self.ids({"title__startswith": "Django"}), [self.article_1.id])
+        self.assertEqual(self.ids({"title__startswith": "dj"}), [self.article_2.id])
+
+    def test_filters_by_ids_and_combines_filters(self):
+        self.assertEqual(
+            self.ids({"ids": f"{self.article_1.id},{self.article_3.id}"}),
+            [self.article_1.id, self.article_3.id],
+        )
+        self.assertEqual(
+            self.ids({"ids": f"{self.article_1.id},{self.article_2.id}", "region": "UK"}),
+            [self.article_2.id],
+        )
+
+    def test_rejects_malformed_filters(self):
+        response = self.client.get(self.url, {"author": "me", "region": "ALB", "ids": "1,x"})
+        self.assertEqual(response.status_code, 400)
+        self.assertCountEqual(response.json().keys(), ["author", "region", "ids"])
+
+    def test_every_filter_is_served_by_an_index(self):
+        plans = {
+            "author=1": "USING INDEX articles_article_author_id",
+            "region=AL,UK": "USING COVERING INDEX articles_article_regions_region_article_idx",
+            "title__startswith=Dja": "USING INDEX article_title_idx",
+            "ids=1,2,3": "SEARCH articles_article USING INTEGER PRIMARY KEY",
+        }
+        for params, expected in plans.items():
+            plan = self.plan(params)
+            self.assertIn(expected, plan, params)
+            self.assertNotIn("SCAN articles_article", plan, params)
+
+
+class ArticleSparseFieldsTestCase(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(
+            title="Fake Article 1", content="Long content", author=self.author
+        )
+        self.article.regions.set([self.region])
+        self.list_url = reverse("articles-list")
+        self.url = reverse("article", kwargs={"article_id": self.article.id})
+
+    def test_list_selects_and_serializes_only_requested_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {"fields": "id,title"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"id": self.article.id, "title": "Fake Article 1"}])
+        # The validator and the articles, with no author join or region prefetch
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn('"content"', queries[1]["sql"])
+        self.assertNotIn("authors_author", queries[1]["sql"])
+
+    def test_detail_joins_only_requested_relations(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"fields": "title,author"})
+        self.assertEqual(
+            response.json(),
+            {
+                "title": "Fake Article 1",
+                "author": {
+                    "id": self.author.id,
+                    "first_name": "Dunsin",
+                    "last_name": "TesterMan",
+                },
+            },
+        )
+        response = self.client.get(self.url, {"fields": "regions"})
+        self.assertEqual(response.json(), {"regions": [{"code": "AL", "name": "Albania"}]})
+
+    def test_applies_to_search_and_export(self):
+        response = self.client.get(reverse("articles-search"), {"q": "fake", "fields": "id"})
+        self.assertEqual(response.json()[0].keys(), {"id", "snippet"})
+        response = self.client.get(self.list_url, {"format": "ndjson", "fields": "title"})
+        self.assertEqual(b"".join(response.streaming_content), b'{"title": "Fake Article 1"}\n')
+
+    def test_rejects_unknown_fields(self):
+        response = self.client.get(self.url, {"fields": "title,secret"})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {"fields": ["Unknown field(s): secret."]})
+        response = self.client.get(self.list_url, {"fields": ""})
+        self.assertEqual(response.status_code, 400)
+
+    def test_equivalent_field_lists_share_one_dumper(self):
+        get_dumper.cache_clear()
+        for value in ("title,id", "id,title", "id,title,id,id", "title,,id"):
+            response = self.client.get(self.url, {"fields": value})
+            self.assertEqual(response.json(), {"id": self.article.id, "title": "Fake Article 1"})
+        self.assertEqual(get_dumper.cache_info().currsize, 1)
+
+
+class ArticleDumperTestCase(TestCase):
+    def setUp(self):
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        region_1 = Region.objects.create(code="AL", name="Albania")
+        region_2 = Region.objects.create(code="UK", name="United Kingdom")
+        Article.objects.create(title="Fake Article 1")
+        article = Article.objects.create(title="Fake Article 2", content="Ü", author=author)
+        article.regions.set([region_1, region_2])
+
+    def test_matches_marshmallow_output_byte_for_byte(self):
+        for only in (None, ("id", "title"), ("author", "regions")):
+            articles = list(Article.objects.all())
+            expected = json.dumps(ArticleSchema(only=only).dump(articles, many=True))
+            actual = json.dumps(get_dumper(ArticleSchema, only).dump(articles, many=True))
+            self.assertEqual(actual, expected)
+        authors = list(Author.objects.values("id", "first_name", "last_name"))
+        self.assertEqual(
+            json.dumps(get_dumper(AuthorSchema).dump(authors, many=True)),
+            json.dumps(AuthorSchema().dump(authors, many=True)),
+        )
+
+    def test_schema_instances_are_shared(self):
+        self.assertIs(get_schema(ArticleSchema), get_schema(ArticleSchema))
+        self.assertIs(get_dumper(ArticleSchema, ("id",)), get_dumper(ArticleSchema, ("id",)))
+        self.assertIsNot(get_dumper(ArticleSchema, ("id",)), get_dumper(ArticleSchema))
+
+
+class ArticleValuesReadTestCase(TestCase):
+    def setUp(self):
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        region_1 = Region.objects.create(code="UK", name="United Kingdom")
+        region_2 = Region.objects.create(code="AL", name="Albania")
+        Article.objects.create(title="Fake Article 1")
+        article = Article.objects.create(title="Fake Article 2", content="Ü", author=author)
+        article.regions.set([region_1, region_2])
+        Article.objects.create(title="Fake Article 3", author=author).regions.set([region_2])
+
+    def test_matches_the_instance_path_byte_for_byte(self):
+        for only in (None, ("id", "title"), ("author",), ("regions",)):
+            schema = get_schema(ArticleSchema, only)
+            articles = list(schema.optimize_queryset(Article.objects.order_by("pk")))
+            rows = schema.attach_relations(
+                list(schema.values_queryset(Article.objects.order_by("pk")))
+            )
+            dumper = get_dumper(ArticleSchema, only)
+            self.assertEqual(
+                json.dumps(dumper.dump(rows, many=True)),
+                json.dumps(dumper.dump(articles, many=True)),
+            )
+
+    def test_list_views_build_no_model_instances(self):
+        for model, url in (
+            (Article, reverse("articles-list")),
+            (Author, reverse("authors-list")),
+            (Region, reverse("regions-list")),
+        ):
+            with mock.patch.object(model, "from_db") as from_db:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json())
+            from_db.assert_not_called()
+
+
+class ArticleCounterTestCase(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.other = Author.objects.create(first_name="Jane", last_name="Smith")
+        self.albania = Region.objects.create(code="AL", name="Albania")
+        self.kingdom = Region.objects.create(code="UK", name="United Kingdom")
+
+    def counts(self, model):
+        return dict(model.objects.order_by("pk").values_list("pk", "article_count"))
+
+    def test_counts_follow_article_saves_and_deletes(self):
+        article = Article.objects.create(title="Counted", author=self.author)
+        self.assertEqual(self.counts(Author), {self.author.id: 1, self.other.id: 0})
+        article.author = self.other
+        article.save()
+        self.assertEqual(self.counts(Author), {self.author.id: 0, self.other.id: 1})
+        article.title = "Renamed"
+        article.save(update_fields=["title"])
+        article.delete()
+        self.assertEqual(self.counts(Author), {self.author.id: 0, self.other.id: 0})
+
+    def test_counts_follow_region_links_from_either_side(self):
+        first = Article.objects.create(title="First")
+        second = Article.objects.create(title="Second")
+        first.regions.set([self.albania, self.kingdom])
+        first.regions.add(self.albania)
+        self.kingdom.articles.add(second)
+        self.assertEqual(self.counts(Region), {self.albania.id: 1, self.kingdom.id: 2})
+        first.regions.remove(self.albania, self.albania)
+        self.kingdom.articles.remove(first)
+        self.assertEqual(self.counts(Region), {self.albania.id: 0, self.kingdom.id: 1})
+        first.regions.set([self.albania])
+        self.kingdom.articles.clear()
+        self.assertEqual(self.counts(Region), {self.albania.id: 1, self.kingdom.id: 0})
+        first.delete()
+        self.assertEqual(self.counts(Region), {self.albania.id: 0, self.kingdom.id: 0})
+
+    def test_counts_follow_the_api_including_bulk_writes(self):
+        article = Article.objects.create(title="Existing", author=self.author)
+        article.regions.set([self.albania])
+        payload = [
+            {"title": "New", "author": self.other.id, "regions": [{"code": "UK"}]},
+            {"id": article.id, "title": "Moved", "author": self.other.id, "regions": [{"code": "UK"}]},
+        ]
+        response = self.client.post(
+            reverse("articles-bulk"), data=json.dumps(payload), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.counts(Author), {self.author.id: 0, self.other.id: 2})
+        self.assertEqual(self.counts(Region), {self.albania.id: 0, self.kingdom.id: 2})
+        response = self.client.get(reverse("author", kwargs={"author_id": self.other.id}))
+        self.assertEqual(response.json()["article_count"], 2)
+        self.client.delete(reverse("article", kwargs={"article_id": article.id}))
+        response = self.client.get(reverse("author", kwargs={"author_id": self.other.id}))
+        self.assertEqual(response.json()["article_count"], 1)
+
+    def test_stale_instances_do_not_overwrite_counts(self):
+        stale = Author.objects.get(pk=self.author.pk)
+        Article.objects.create(title="Counted", author=self.author)
+        stale.first_name = "Renamed"
+        stale.save()
+        self.assertEqual(Author.objects.get(pk=self.author.pk).article_count, 1)
+
+    def test_drifted_counts_do_not_fail_writes(self):
+        # As after a bulk_create, which skips the signals
+        Article.objects.bulk_create([Article(title="Uncounted", author=self.author)])
+        article = Article.objects.get()
+        article.regions.through.objects.create(article=article, region=self.albania)
+        response = self.client.put(
+            reverse("article", kwargs={"article_id": article.id}),
+            data=json.dumps({"author": self.other.id, "regions": []}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(Author), {self.author.id: 0, self.other.id: 1})
+        self.assertEqual(self.counts(Region), {self.albania.id: 0, self.kingdom.id: 0})
+
+    def test_reconcile_command_fixes_drifted_counts_in_batches(self):
+        Article.objects.create(title="Counted", author=self.author).regions.set([self.albania])
+        Author.objects.update(article_count=5)
+        Region.objects.filter(pk=self.kingdom.pk).update(article_count=3)
+        out = StringIO()
+        call_command("reconcile_counters", "--batch-size", "1", stdout=out)
+        self.assertEqual(self.counts(Author), {self.author.id: 1, self.other.id: 0})
+        self.assertEqual(self.counts(Region), {self.albania.id: 1, self.kingdom.id: 0})
+        self.assertIn("authors: checked 2, fixed 2.", out.getvalue())
+        self.assertIn("regions: checked 2, fixed 1.", out.getvalue())
+
+
+@override_settings(
+    ROOT_URLCONF="techtest.async_urls", MIDDLEWARE=["techtest.metrics.MetricsMiddleware"]
+)
+class ArticleAsyncViewsTestCase(TransactionTestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        region = Region.objects.create(code="AL", name="Albania")
+        self.article = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.article.regions.set([region])
+        Article.objects.create(title="Fake Article 2", content="Lorem Ipsum")
+        self.url = reverse("article", kwargs={"article_id": self.article.id})
+
+    async def test_serves_the_same_bodies_as_the_sync_views(self):
+        for url, params in (
+            (reverse("articles-list"), {}),
+            (reverse("articles-list"), {"limit": 1, "fields": "id,regions"}),
+            (reverse("articles-list"), {"author": self.author.id}),
+            (self.url, {}),
+            (self.url, {"fields": "author"}),
+        ):
+            # Django 3.2's AsyncClient drops ``data`` on GET; put it in the URL
+            response = await self.async_client.get(f"{url}?{urlencode(params)}")
+            self.assertEqual(response.status_code, 200)
+            with override_settings(ROOT_URLCONF="techtest.urls"):
+                expected = await sync_to_async(self.client.get)(url, params)
+            self.assertEqual(response.content, expected.content)
+            self.assertEqual(response.get("Link"), expected.get("Link"))
+        response = await self.async_client.get(reverse("article", kwargs={"article_id": 0}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_answers_conditional_requests_and_serves_from_cache(self):
+        response = await self.async_client.get(self.url)
+        # ...and sends extra kwargs as raw header names rather than WSGI keys
+        response = await self.async_client.get(self.url, **{"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+        self.assertIsNotNone(response_cache().get(cache_key(Article, self.article.id)))
+
+    async def test_hands_writes_to_the_sync_views(self):
+        await self.async_client.get(self.url)
+        response = await self.async_client.put(
+            self.url, {"title": "Updated"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json()["title"], "Updated")
+        response = await self.async_client.post(
+            reverse("articles-list"), {"title": "New"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+
+    async def test_refuses_ndjson_exports(self):
+        response = await self.async_client.get(reverse("articles-list") + "?format=ndjson")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), ASYNC_EXPORT_ERROR)
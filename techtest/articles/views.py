@@ -1,44 +1,142 @@
 import json
 
 from marshmallow import ValidationError
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from django.views.generic import View
 
 from techtest.articles.models import Article
-from techtest.articles.schemas import ArticleSchema
-from techtest.utils import json_response
+from techtest.articles.schemas import (
+    ArticleBulkSchema,
+    ArticleFilterSchema,
+    ArticleSchema,
+    bulk_save_articles,
+)
+from techtest.articles.search import search
+from techtest.cache import cache_response
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.conditional import conditional_get, object_version, table_version
+from techtest.pagination import CursorPaginationMixin, encode_cursor
+from techtest.serializers import get_dumper
+from techtest.utils import json_response, requested_fields
 
 
-class ArticlesListView(View):
+@method_decorator(conditional_get(table_version(Article)), name="dispatch")
+class ArticlesListView(CursorPaginationMixin, View):
     def get(self, request, *args, **kwargs):
-        return json_response(ArticleSchema().dump(Article.objects.all(), many=True))
+        filter_schema = ArticleFilterSchema()
+        try:
+            serializer = get_dumper(ArticleSchema, requested_fields(request, ArticleSchema))
+            filters = filter_schema.load(request.GET)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        queryset = serializer.schema.values_queryset(
+            filter_schema.filter_queryset(Article.objects.all(), filters)
+        )
+        if self.wants_export(request):
+            return self.export_response(queryset, serializer)
+        try:
+            articles = self.paginate_queryset(request, queryset)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        return self.paginated_response(request, self.dump_rows(articles, serializer))
+
+    def dump_rows(self, rows, serializer):
+        return serializer.dump(serializer.schema.attach_relations(rows), many=True)
 
     def post(self, request, *args, **kwargs):
         try:
             article = ArticleSchema().load(json.loads(request.body))
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(ArticleSchema().dump(article), 201)
+        return json_response(get_dumper(ArticleSchema).dump(article), 201)
+
+
+@method_decorator(conditional_get(table_version(Article)), name="dispatch")
+class ArticlesSearchView(CursorPaginationMixin, View):
+    """Ranked full-text search; each result is an article plus a highlighted snippet."""
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "").strip()
+        if not query:
+            return json_response({"q": ["Missing data for required field."]}, 400)
+        try:
+            serializer = get_dumper(ArticleSchema, requested_fields(request, ArticleSchema))
+            page_size = self.get_page_size(request)
+            position = self.get_position(request)
+            if position is not None and not isinstance(position.get("rank"), (int, float)):
+                raise ValidationError({"cursor": ["Invalid cursor."]})
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        after = position and (position["rank"], position["pk"])
+        rows = search(query, page_size + 1, after)
+        self.next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            self.next_cursor = encode_cursor({"pk": rows[-1][0], "rank": rows[-1][1]})
+        articles = serializer.schema.optimize_queryset(Article.objects.all()).in_bulk(
+            [article_id for article_id, _, _ in rows]
+        )
+        rows = [row for row in rows if row[0] in articles]
+        results = serializer.dump([articles[article_id] for article_id, _, _ in rows], many=True)
+        for result, (_, _, snippet) in zip(results, rows):
+            result["snippet"] = snippet
+        return self.paginated_response(request, results)
+
+
+class ArticlesBulkView(View):
+    max_batch_size = 1000
+
+    def post(self, request, *args, **kwargs):
+        payload = json.loads(request.body)
+        if isinstance(payload, list) and len(payload) > self.max_batch_size:
+            return json_response(
+                {"error": f"A batch can hold at most {self.max_batch_size} articles"}, 400
+            )
+        try:
+            article_ids = bulk_save_articles(ArticleBulkSchema(many=True).load(payload))
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        serializer = get_dumper(ArticleSchema)
+        articles = serializer.schema.optimize_queryset(Article.objects.all()).in_bulk(
+            article_ids
+        )
+        return json_response(
+            serializer.dump([articles[pk] for pk in article_ids], many=True), 201
+        )
 
 
+@method_decorator(cache_response(Article, "article_id"), name="dispatch")
+@method_decorator(conditional_get(object_version(Article, "article_id")), name="dispatch")
 class ArticleView(View):
     def dispatch(self, request, article_id, *args, **kwargs):
         try:
-            self.article = Article.objects.get(pk=article_id)
+            fields = requested_fields(request, ArticleSchema) if request.method == "GET" else None
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        self.serializer = get_dumper(ArticleSchema, fields)
+        try:
+            self.article = self.serializer.schema.optimize_queryset(Article.objects.all()).get(
+                pk=article_id
+            )
         except Article.DoesNotExist:
             return json_response({"error": "No Article matches the given query"}, 404)
         self.data = request.body and dict(json.loads(request.body), id=self.article.id)
         return super(ArticleView, self).dispatch(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
-        return json_response(ArticleSchema().dump(self.article))
+        return json_response(self.serializer.dump(self.article))
 
     def put(self, request, *args, **kwargs):
         try:
-            self.article = ArticleSchema().load(self.data)
+            self.article = ArticleSchema(context={"article": self.article}).load(self.data)
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(ArticleSchema().dump(self.article))
+        return json_response(get_dumper(ArticleSchema).dump(self.article))
 
+    @transaction.atomic
     def delete(self, request, *args, **kwargs):
+        record(Article, [self.article.pk], Change.DELETE)
         self.article.delete()
         return json_response()
@@ -2,6 +2,7 @@
 ASGI config for techtest project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+It defaults to techtest.asgi_settings, which serves reads from async views.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.2/howto/deployment/asgi/
@@ -11,6 +12,12 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techtest.settings')
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techtest.asgi_settings')
 
 application = get_asgi_application()
+
+# Load the region lookup table before the first request (and before a
+# pre-forking server copies this process)
+from techtest.regions.cache import region_cache  # noqa: E402
+
+region_cache.warm()
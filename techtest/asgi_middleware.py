@@ -0,0 +1,25 @@
+"""Django's security and common middleware for the ASGI stack.
+
+Under ASGI, ``MiddlewareMixin`` runs every ``process_request`` and
+``process_response`` hook through ``sync_to_async(thread_sensitive=True)``,
+on the single thread-sensitive worker, which would serialize requests again.
+The hooks of these two only read the request and set headers (or resolve
+the URL, for ``APPEND_SLASH``), so these subclasses call them on the event
+loop instead.
+"""
+from django.middleware import common, security
+
+
+class InlineHooksMixin(object):
+    async def __acall__(self, request):
+        response = self.process_request(request)
+        response = response or await self.get_response(request)
+        return self.process_response(request, response)
+
+
+class SecurityMiddleware(InlineHooksMixin, security.SecurityMiddleware):
+    pass
+
+
+class CommonMiddleware(InlineHooksMixin, common.CommonMiddleware):
+    pass
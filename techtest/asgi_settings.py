@@ -0,0 +1,20 @@
+"""Settings for the ASGI entry point (techtest/asgi.py).
+
+Routes reads to the async views and keeps only middleware that doesn't hop
+threads: Django runs each sync middleware hook, MiddlewareMixin ones
+included, on the single thread-sensitive worker, which would serialize
+requests again. The security and common middleware run on the event loop
+(techtest/asgi_middleware.py). Left out are the session, auth and messages
+middleware, which read the database, the clickjacking middleware, as in
+techtest/api_settings.py, and the profiling middleware, which can only
+profile sync view calls; profile requests through the WSGI stack.
+"""
+from techtest.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'techtest.async_urls'
+
+MIDDLEWARE = [
+    'techtest.metrics.MetricsMiddleware',
+    'techtest.asgi_middleware.SecurityMiddleware',
+    'techtest.asgi_middleware.CommonMiddleware',
+]
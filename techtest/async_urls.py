@@ -0,0 +1,31 @@
+"""URLs for the ASGI entry point (techtest/asgi_settings.py).
+
+The same routes and names as techtest/urls.py, with the list and detail
+endpoints served by async views. The other views stay sync and run on the
+thread-sensitive worker. The admin is left out, since the ASGI middleware
+stack has no sessions or authentication.
+"""
+from django.urls import path
+
+from techtest.articles.async_views import article_detail, articles_list
+from techtest.articles.views import ArticlesBulkView, ArticlesSearchView
+from techtest.asyncdb import sync_view
+from techtest.authors.async_views import author_detail, authors_list
+from techtest.batch import BatchView
+from techtest.changes.async_views import changes_feed
+from techtest.metrics import MetricsView
+from techtest.regions.async_views import region_detail, regions_list
+
+urlpatterns = [
+    path("articles/", articles_list, name="articles-list"),
+    path("articles/search/", sync_view(ArticlesSearchView), name="articles-search"),
+    path("articles/bulk/", sync_view(ArticlesBulkView), name="articles-bulk"),
+    path("articles/<int:article_id>/", article_detail, name="article"),
+    path("regions/", regions_list, name="regions-list"),
+    path("regions/<int:region_id>/", region_detail, name="region"),
+    path("authors/", authors_list, name="authors-list"),
+    path("authors/<int:author_id>/", author_detail, name="author"),
+    path("batch/", sync_view(BatchView), name="batch"),
+    path("changes/", changes_feed, name="changes"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
+]
@@ -0,0 +1,48 @@
+"""Running ORM work from the async views.
+
+Django 3.2's ORM is sync-only. ``database_sync_to_async`` runs a function on
+a bounded pool of ``ASYNC_DB_THREADS`` threads, as
+``sync_to_async(thread_sensitive=False)``, so requests don't queue behind
+the single thread-sensitive worker and the independent queries of one
+request can run at the same time. Each pool thread keeps its own
+(persistent) connection.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache, wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+from techtest.metrics import db_instrumentation
+
+
+@lru_cache(maxsize=None)
+def executor():
+    return ThreadPoolExecutor(
+        max_workers=settings.ASYNC_DB_THREADS, thread_name_prefix="techtest-db"
+    )
+
+
+def database_sync_to_async(func):
+    @wraps(func)
+    def run(*args, **kwargs):
+        # Pool threads see no request_started/finished signals, which is
+        # where Django drops expired or broken connections
+        close_old_connections()
+        with db_instrumentation():
+            return func(*args, **kwargs)
+
+    return sync_to_async(run, thread_sensitive=False, executor=executor())
+
+
+def sync_view(view_class):
+    """A sync class-based view as an async callable, run by the thread-sensitive
+    worker like Django runs sync views under ASGI, with its queries metered."""
+    view = view_class.as_view()
+
+    def run(request, *args, **kwargs):
+        with db_instrumentation():
+            return view(request, *args, **kwargs)
+
+    return sync_to_async(run)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthorsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'techtest.authors'
+
+    def ready(self):
+        from techtest.authors import signals  # noqa: F401
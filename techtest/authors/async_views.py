@@ -0,0 +1,47 @@
+"""Async versions of the author list and detail views, for the ASGI entry point.
+
+Reads are served here with the ORM work offloaded to the database threads;
+writes are handed to the sync views in techtest/authors/views.py.
+"""
+from marshmallow import ValidationError
+
+from techtest.authors.models import Author
+from techtest.authors.schemas import AuthorSchema
+from techtest.authors.views import AuthorView, AuthorsListView, list_version
+from techtest.asyncdb import database_sync_to_async, sync_view
+from techtest.cache import cache_response
+from techtest.conditional import conditional_get, object_version
+from techtest.pagination import ASYNC_EXPORT_ERROR
+from techtest.serializers import get_dumper
+from techtest.utils import dumped_values, json_response, requested_fields
+
+
+@conditional_get(list_version)
+async def authors_list(request):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(AuthorsListView)(request)
+    paginator = AuthorsListView()
+    if paginator.wants_export(request):
+        return json_response(ASYNC_EXPORT_ERROR, 400)
+    try:
+        serializer, queryset = paginator.list_queryset(request)
+        authors = await database_sync_to_async(paginator.paginate_queryset)(request, queryset)
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    return paginator.paginated_response(request, serializer.dump(authors, many=True))
+
+
+@cache_response(Author, "author_id")
+@conditional_get(object_version(Author, "author_id"))
+async def author_detail(request, author_id):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(AuthorView)(request, author_id=author_id)
+    try:
+        serializer = get_dumper(AuthorSchema, requested_fields(request, AuthorSchema))
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    queryset = dumped_values(Author.objects.filter(pk=author_id), serializer.schema)
+    authors = await database_sync_to_async(list)(queryset)
+    if not authors:
+        return json_response({"error": "No Author matches the given query"}, 404)
+    return json_response(serializer.dump(authors[0]))
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.7 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authors', '0002_add_updated_at'),
+        ('articles', '0002_add_author_relationship'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='author',
+            index=models.Index(fields=['article_count'], name='author_article_count_idx'),
+        ),
+        # Start from the current counts; later writes keep them up to date
+        migrations.RunSQL(
+            """
+            UPDATE "authors_author" SET "article_count" = (
+                SELECT COUNT(*) FROM "articles_article"
+                WHERE "articles_article"."author_id" = "authors_author"."id"
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -3,3 +3,20 @@ from django.db import models
 class Author(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
+    # Maintained by techtest/articles/counters.py
+    article_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["article_count"], name="author_article_count_idx")]
+
+    def save(self, *args, **kwargs):
+        # Leave article_count out of updates: this instance's copy may be
+        # stale, and only techtest/articles/counters.py moves it
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "article_count"
+            ]
+        super().save(*args, **kwargs)
@@ -1,9 +1,35 @@
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
 from marshmallow import validate
 from marshmallow import fields
 from marshmallow import Schema
-from marshmallow.decorators import post_load
+from marshmallow.decorators import post_load, pre_load
 
+from techtest.articles.models import Article
 from techtest.authors.models import Author
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.utils import dumped_values
+
+
+def latest_article_title():
+    # Served by the author_id index, whose entries SQLite keeps in rowid order
+    latest = Article.objects.filter(author_id=OuterRef("pk")).order_by("-pk")
+    return Subquery(latest.values("title")[:1])
+
+
+# Figures about an author's articles, as annotations for the list query
+STATS = {
+    "latest_article_title": latest_article_title,
+}
+
+
+class AuthorLiteSchema(Schema):
+    """Lightweight serializer used when embedding authors in other resources."""
+
+    id = fields.Integer()
+    first_name = fields.String()
+    last_name = fields.String()
 
 
 class AuthorSchema(Schema):
@@ -13,10 +39,35 @@ class AuthorSchema(Schema):
     id = fields.Integer()
     first_name = fields.String(required=True, validate=validate.Length(max=255))
     last_name = fields.String(required=True, validate=validate.Length(max=255))
+    article_count = fields.Integer(dump_only=True)
+
+    def values_queryset(self, queryset, *extra):
+        """``.values()`` rows for the list views: the dumped columns, the
+        ``STATS`` this schema dumps, and any ``extra`` columns (e.g. to order by)."""
+        stats = [name for name in STATS if name in self.dump_fields]
+        queryset = queryset.annotate(**{name: STATS[name]() for name in stats})
+        extra = [name for name in extra if name not in self.dump_fields]
+        return dumped_values(queryset, self, *stats, *extra)
+
+    @pre_load
+    def drop_article_count(self, data, **kwargs):
+        # Maintained by the server; accepted, and ignored, so that clients
+        # can send back what they read
+        if isinstance(data, dict):
+            data = {name: value for name, value in data.items() if name != "article_count"}
+        return data
 
     @post_load
+    @transaction.atomic(savepoint=False)
     def update_or_create(self, data, *args, **kwargs):
-        author, _ = Author.objects.update_or_create(
+        author, created = Author.objects.update_or_create(
             id=data.pop("id", None), defaults=data
         )
-        return author
\ No newline at end of file
+        record(Author, [author.pk], Change.CREATE if created else Change.UPDATE)
+        return author
+
+
+class AuthorStatsSchema(AuthorSchema):
+    """An author with their latest article's title, for ``?include=stats``."""
+
+    latest_article_title = fields.String(dump_only=True)
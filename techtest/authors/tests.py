@@ -1,9 +1,12 @@
 import json
 
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase, override_settings
 from django.urls import reverse
 
+from techtest.articles.models import Article
 from techtest.authors.models import Author
+from techtest.cache import response_cache
+from techtest.pagination import encode_cursor
 
 
 class AuthorListViewTestCase(TestCase):
@@ -22,15 +25,36 @@ class AuthorListViewTestCase(TestCase):
                     "id": self.author_1.id,
                     "first_name": "John",
                     "last_name": "Doe",
+                    "article_count": 0,
                 },
                 {
                     "id": self.author_2.id,
                     "first_name": "Jane",
                     "last_name": "Smith",
+                    "article_count": 0,
                 },
             ],
         )
 
+    def test_paginates_with_cursor_and_next_link(self):
+        response = self.client.get(self.url, {"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([author["id"] for author in response.json()], [self.author_1.id])
+        next_url = response["Link"].split(";")[0].strip("<>")
+        response = self.client.get(next_url)
+        self.assertEqual([author["id"] for author in response.json()], [self.author_2.id])
+        self.assertFalse(response.has_header("Link"))
+
+    def test_serializes_only_requested_fields(self):
+        response = self.client.get(self.url, {"fields": "id,last_name"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [{"id": self.author_1.id, "last_name": "Doe"}, {"id": self.author_2.id, "last_name": "Smith"}],
+        )
+        response = self.client.get(self.url, {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+
     def test_creates_new_author(self):
         payload = {
             "first_name": "Bob",
@@ -48,6 +72,7 @@ class AuthorListViewTestCase(TestCase):
                 "id": author.id,
                 "first_name": "Bob",
                 "last_name": "Johnson",
+                "article_count": 0,
             },
             response.json(),
         )
@@ -62,6 +87,98 @@ class AuthorListViewTestCase(TestCase):
         self.assertEqual(response.status_code, 400)
 
 
+class AuthorStatsTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("authors-list")
+        self.prolific = Author.objects.create(first_name="John", last_name="Doe")
+        self.occasional = Author.objects.create(first_name="Jane", last_name="Smith")
+        self.idle = Author.objects.create(first_name="Ivy", last_name="Idle")
+        self.other = Author.objects.create(first_name="Max", last_name="Mustermann")
+        for title in ("First", "Second", "Third"):
+            Article.objects.create(title=title, author=self.prolific)
+        Article.objects.create(title="Only", author=self.occasional)
+        Article.objects.create(title="Another", author=self.other)
+
+    def test_includes_article_count_and_latest_title_in_one_query(self):
+        # The two ETag validator aggregates and the annotated list
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {"include": "stats"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "id": self.prolific.id,
+                    "first_name": "John",
+                    "last_name": "Doe",
+                    "article_count": 3,
+                    "latest_article_title": "Third",
+                },
+                {
+                    "id": self.occasional.id,
+                    "first_name": "Jane",
+                    "last_name": "Smith",
+                    "article_count": 1,
+                    "latest_article_title": "Only",
+                },
+                {
+                    "id": self.idle.id,
+                    "first_name": "Ivy",
+                    "last_name": "Idle",
+                    "article_count": 0,
+                    "latest_article_title": None,
+                },
+                {
+                    "id": self.other.id,
+                    "first_name": "Max",
+                    "last_name": "Mustermann",
+                    "article_count": 1,
+                    "latest_article_title": "Another",
+                },
+            ],
+        )
+        response = self.client.get(self.url, {"include": "stats", "fields": "id,article_count"})
+        self.assertEqual(response.json()[0], {"id": self.prolific.id, "article_count": 3})
+        self.assertNotIn("latest_article_title", self.client.get(self.url).json()[0])
+
+    def test_orders_by_article_count_across_pages(self):
+        ids = []
+        url, params = self.url, {"ordering": "-article_count", "limit": 2}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids += [author["id"] for author in response.json()]
+            url = response.get("Link", "").split(";")[0].strip("<>")
+            params = {}
+        # Ties are broken by id, in the same direction
+        self.assertEqual(
+            ids, [self.prolific.id, self.other.id, self.occasional.id, self.idle.id]
+        )
+        response = self.client.get(self.url, {"ordering": "article_count", "include": "stats"})
+        self.assertEqual(
+            [author["article_count"] for author in response.json()], [0, 1, 1, 3]
+        )
+
+    def test_stats_etag_follows_article_writes(self):
+        etag = self.client.get(self.url, {"include": "stats"})["ETag"]
+        Article.objects.create(title="Fourth", author=self.prolific)
+        response = self.client.get(self.url, {"include": "stats"}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["latest_article_title"], "Fourth")
+
+    def test_rejects_unknown_include_and_ordering(self):
+        response = self.client.get(self.url, {"include": "friends"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("include", response.json())
+        response = self.client.get(self.url, {"ordering": "last_name"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("ordering", response.json())
+        response = self.client.get(
+            self.url, {"ordering": "article_count", "cursor": encode_cursor({"pk": 1})}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
 class AuthorViewTestCase(TestCase):
     def setUp(self):
         self.author = Author.objects.create(first_name="John", last_name="Doe")
@@ -76,6 +193,7 @@ class AuthorViewTestCase(TestCase):
                 "id": self.author.id,
                 "first_name": "John",
                 "last_name": "Doe",
+                "article_count": 0,
             },
         )
 
@@ -105,11 +223,62 @@ class AuthorViewTestCase(TestCase):
                 "id": author.id,
                 "first_name": "Jane",
                 "last_name": "Smith",
+                "article_count": 0,
             },
             response.json(),
         )
 
+    def test_serves_repeat_reads_from_cache_until_updated(self):
+        response_cache().clear()
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.put(
+            self.url,
+            data=json.dumps({"first_name": "Jane", "last_name": "Smith"}),
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(self.url).json()["first_name"], "Jane")
+
+    def test_answers_conditional_get_until_updated(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.client.put(
+            self.url,
+            data=json.dumps({"first_name": "Jane", "last_name": "Smith"}),
+            content_type="application/json",
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_removes_author(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Author.objects.count(), 0)
+
+
+@override_settings(
+    ROOT_URLCONF="techtest.async_urls", MIDDLEWARE=["techtest.metrics.MetricsMiddleware"]
+)
+class AuthorAsyncViewsTestCase(TransactionTestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.author = Author.objects.create(first_name="John", last_name="Doe")
+        Author.objects.create(first_name="Jane", last_name="Smith")
+        self.url = reverse("author", kwargs={"author_id": self.author.id})
+
+    async def test_serves_reads_and_hands_writes_to_the_sync_views(self):
+        response = await self.async_client.get(reverse("authors-list") + "?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"id": self.author.id, "first_name": "John", "last_name": "Doe", "article_count": 0}])
+        self.assertIn('rel="next"', response["Link"])
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {"id": self.author.id, "first_name": "John", "last_name": "Doe", "article_count": 0})
+        response = await self.async_client.put(
+            self.url, {"first_name": "Johnny", "last_name": "Doe"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {"id": self.author.id, "first_name": "Johnny", "last_name": "Doe", "article_count": 0})
@@ -1,44 +1,99 @@
 import json
 
 from marshmallow import ValidationError
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from django.views.generic import View
 
+from techtest.articles.models import Article
 from techtest.authors.models import Author
-from techtest.authors.schemas import AuthorSchema
-from techtest.utils import json_response
+from techtest.authors.schemas import AuthorSchema, AuthorStatsSchema
+from techtest.cache import cache_response
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.conditional import conditional_get, object_version, table_version
+from techtest.pagination import CursorPaginationMixin
+from techtest.serializers import get_dumper
+from techtest.utils import json_response, only_dumped_fields, requested_fields
 
 
-class AuthorsListView(View):
+def list_schema(request):
+    """AuthorSchema, or AuthorStatsSchema for ``?include=stats``."""
+    include = [name for name in request.GET.get("include", "").split(",") if name]
+    unknown = sorted(set(include) - {"stats"})
+    if unknown:
+        raise ValidationError({"include": ["Unknown value(s): {}.".format(", ".join(unknown))]})
+    return AuthorStatsSchema if include else AuthorSchema
+
+
+def list_version(request, **kwargs):
+    # Article writes change the stats, so they count towards the version too
+    if request.GET.get("include"):
+        return table_version(Author, Article)(request, **kwargs)
+    return table_version(Author)(request, **kwargs)
+
+
+@method_decorator(conditional_get(list_version), name="dispatch")
+class AuthorsListView(CursorPaginationMixin, View):
+    ordering_fields = ("article_count",)
+
     def get(self, request, *args, **kwargs):
-        return json_response(AuthorSchema().dump(Author.objects.all(), many=True))
+        try:
+            serializer, queryset = self.list_queryset(request)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        if self.wants_export(request):
+            return self.export_response(queryset, serializer)
+        try:
+            authors = self.paginate_queryset(request, queryset)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        return self.paginated_response(request, serializer.dump(authors, many=True))
+
+    def list_queryset(self, request):
+        """The dumper and the ``.values()`` queryset for a list request."""
+        schema_class = list_schema(request)
+        serializer = get_dumper(schema_class, requested_fields(request, schema_class))
+        ordering = self.get_ordering(request)
+        extra = (ordering[0],) if ordering else ()
+        return serializer, serializer.schema.values_queryset(Author.objects.all(), *extra)
 
     def post(self, request, *args, **kwargs):
         try:
             author = AuthorSchema().load(json.loads(request.body))
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(AuthorSchema().dump(author), 201)
+        return json_response(get_dumper(AuthorSchema).dump(author), 201)
 
 
+@method_decorator(cache_response(Author, "author_id"), name="dispatch")
+@method_decorator(conditional_get(object_version(Author, "author_id")), name="dispatch")
 class AuthorView(View):
     def dispatch(self, request, author_id, *args, **kwargs):
         try:
-            self.author = Author.objects.get(pk=author_id)
+            fields = requested_fields(request, AuthorSchema) if request.method == "GET" else None
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        self.serializer = get_dumper(AuthorSchema, fields)
+        try:
+            self.author = only_dumped_fields(Author.objects.all(), self.serializer.schema).get(pk=author_id)
         except Author.DoesNotExist:
             return json_response({"error": "No Author matches the given query"}, 404)
         self.data = request.body and dict(json.loads(request.body), id=self.author.id)
         return super(AuthorView, self).dispatch(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
-        return json_response(AuthorSchema().dump(self.author))
+        return json_response(self.serializer.dump(self.author))
 
     def put(self, request, *args, **kwargs):
         try:
             self.author = AuthorSchema().load(self.data)
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(AuthorSchema().dump(self.author))
+        return json_response(get_dumper(AuthorSchema).dump(self.author))
 
+    @transaction.atomic
     def delete(self, request, *args, **kwargs):
+        record(Author, [self.author.pk], Change.DELETE)
         self.author.delete()
         return json_response()
\ No newline at end of file
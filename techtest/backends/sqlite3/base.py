@@ -0,0 +1,46 @@
+"""SQLite backend with the connection setup Django 3.2 lacks for concurrent use.
+
+Two extra keys are read from ``OPTIONS`` (everything else still goes to
+``sqlite3.connect``):
+
+- ``pragmas``: ``{name: value}`` applied to every new connection, e.g.
+  ``journal_mode=WAL`` so readers don't block the writer
+- ``transaction_mode``: ``"IMMEDIATE"`` makes atomic blocks take the write
+  lock up front. A deferred transaction that reads before writing can't
+  wait for the lock when another writer holds it and fails with "database
+  is locked" at once, whatever the busy timeout.
+
+``is_usable`` runs a trivial query, so with ``CONN_MAX_AGE`` a persistent
+connection that saw an error is checked and replaced if it is broken
+(Django 3.2 has no ``CONN_HEALTH_CHECKS``).
+"""
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = params.pop("pragmas", {})
+        self.transaction_mode = params.pop("transaction_mode", None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            if not name.isidentifier():
+                raise ValueError(f"Invalid pragma name {name!r}")
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def is_usable(self):
+        try:
+            self.connection.execute("SELECT 1")
+        except base.Database.Error:
+            return False
+        return True
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f"BEGIN {self.transaction_mode}")
+        else:
+            super()._start_transaction_under_autocommit()
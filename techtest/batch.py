@@ -0,0 +1,72 @@
+"""Fetching many articles, authors and regions by id in one request.
+
+``POST /batch/`` takes ``{"articles": [ids], "authors": [ids], "regions":
+[ids]}`` (any subset of the keys) and answers with the objects of each kind,
+dumped by the same schemas as the detail views, in the requested order,
+plus the ids that matched nothing under ``missing``. Each kind is read with
+one ``IN`` query (articles with their author and region queries on top).
+"""
+import json
+
+from django.views.generic import View
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate
+
+from techtest.articles.models import Article
+from techtest.articles.schemas import ArticleSchema
+from techtest.authors.models import Author
+from techtest.authors.schemas import AuthorSchema
+from techtest.regions.models import Region
+from techtest.regions.schemas import RegionSchema
+from techtest.serializers import get_dumper
+from techtest.utils import dumped_values, json_response
+
+ENTITIES = {
+    "articles": (Article, ArticleSchema),
+    "authors": (Author, AuthorSchema),
+    "regions": (Region, RegionSchema),
+}
+
+
+def batch_ids():
+    return fields.List(fields.Integer(strict=True), validate=validate.Length(max=1000))
+
+
+class BatchSchema(Schema):
+    class Meta(object):
+        unknown = EXCLUDE
+
+    articles = batch_ids()
+    authors = batch_ids()
+    regions = batch_ids()
+
+
+def fetch_rows(model, serializer, ids):
+    """``{id: row}`` of the ``model`` objects with the given ids, as ``.values()``
+    rows ready for ``serializer``."""
+    schema = serializer.schema
+    queryset = model.objects.filter(pk__in=ids)
+    if model is Article:
+        rows = schema.attach_relations(list(schema.values_queryset(queryset)))
+    else:
+        rows = dumped_values(queryset, schema)
+    return {row["id"]: row for row in rows}
+
+
+class BatchView(View):
+    def post(self, request, *args, **kwargs):
+        try:
+            requested = BatchSchema().load(json.loads(request.body))
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        data = {}
+        missing = {}
+        for name, ids in requested.items():
+            model, schema_class = ENTITIES[name]
+            serializer = get_dumper(schema_class)
+            # Repeated ids are answered once, at their first position
+            ids = list(dict.fromkeys(ids))
+            rows = fetch_rows(model, serializer, ids) if ids else {}
+            data[name] = serializer.dump([rows[pk] for pk in ids if pk in rows], many=True)
+            missing[name] = [pk for pk in ids if pk not in rows]
+        data["missing"] = missing
+        return json_response(data)
@@ -0,0 +1,92 @@
+import asyncio
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http.response import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date
+
+
+def response_cache():
+    return caches[settings.RESPONSE_CACHE_ALIAS]
+
+
+def cache_key(model, pk):
+    return "response:{}:{}".format(model._meta.label_lower, pk)
+
+
+def invalidate(model, pks):
+    """Evict the cached responses of ``model`` objects with the given pks.
+
+    Entries are dropped right away and again once the surrounding transaction
+    commits, so a concurrent GET can't re-cache a row that is still being
+    written.
+    """
+    keys = [cache_key(model, pk) for pk in pks]
+    if not keys:
+        return
+    response_cache().delete_many(keys)
+    transaction.on_commit(lambda: response_cache().delete_many(keys))
+
+
+def cache_response(model, pk_kwarg):
+    """View decorator caching the JSON body of detail GETs, keyed by model and pk.
+
+    Only requests without a query string go through the cache, since query
+    parameters change the body. The ETag and Last-Modified headers are stored
+    with the body, so conditional requests are answered from the cache too.
+    Entries are evicted by the model signal handlers registered in each app's
+    ``signals`` module.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method != "GET" or request.GET:
+                    return await view(request, *args, **kwargs)
+                key = cache_key(model, kwargs[pk_kwarg])
+                entry = response_cache().get(key)
+                if entry is not None:
+                    return cached_response(request, entry)
+                return store_response(key, await view(request, *args, **kwargs))
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != "GET" or request.GET:
+                return view(request, *args, **kwargs)
+            key = cache_key(model, kwargs[pk_kwarg])
+            entry = response_cache().get(key)
+            if entry is not None:
+                return cached_response(request, entry)
+            return store_response(key, view(request, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def cached_response(request, entry):
+    """Rebuild a response from a cache entry, answering conditional requests."""
+    content, etag, last_modified = entry
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and parse_http_date(last_modified),
+    ) or HttpResponse(content, content_type="application/json")
+    for header, value in (("ETag", etag), ("Last-Modified", last_modified)):
+        if value:
+            response[header] = value
+    return response
+
+
+def store_response(key, response):
+    if response.status_code == 200:
+        entry = (response.content, response.get("ETag"), response.get("Last-Modified"))
+        response_cache().set(key, entry, settings.RESPONSE_CACHE_TIMEOUT)
+    return response
@@ -0,0 +1,30 @@
+"""Async version of the change feed, for the ASGI entry point.
+
+A long poll waits on the event loop rather than holding one of the database
+threads (or, through ``sync_view``, the thread-sensitive worker every sync
+view shares).
+"""
+import time
+
+from django.conf import settings
+from django.http import HttpResponseNotAllowed
+
+from techtest.asyncdb import database_sync_to_async
+from techtest.changes.log import notifier, read
+from techtest.changes.views import feed_response, load_params
+
+
+async def changes_feed(request):
+    if request.method not in ("GET", "HEAD"):
+        return HttpResponseNotAllowed(["GET", "HEAD"])
+    params, error = await database_sync_to_async(load_params)(request)
+    if error is not None:
+        return error
+    deadline = time.monotonic() + params["wait"]
+    while True:
+        version = notifier.version
+        changes = await database_sync_to_async(read)(params["since"], params["limit"])
+        remaining = deadline - time.monotonic()
+        if changes or remaining <= 0:
+            return feed_response(request, changes, params["since"])
+        await notifier.async_wait(version, min(remaining, settings.CHANGES_POLL_INTERVAL))
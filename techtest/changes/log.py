@@ -0,0 +1,133 @@
+"""The change feed of articles, authors and regions.
+
+Every write the API makes records ``(entity, id, action)`` entries in the
+``Change`` table, in the same transaction as the write itself:
+
+- creates and updates through the schemas' ``update_or_create`` and
+  ``bulk_save_articles`` (authors and regions an article write creates
+  included), and deletes through the detail views; an article update logs
+  one entry, whether it changed columns, region links or both
+- updates of the articles that embed a changed author or region, and of the
+  authors and regions whose article count moved (``touch`` in
+  techtest/articles/signals.py and ``counters.adjust``), so that a mirror
+  of the API responses stays exact
+
+SQLite serializes writers, so entries are committed in id order and a
+consumer that has read everything up to ``since`` never sees an older id
+appear later. Entries carry no data: consumers fetch the current state of
+the objects through ``POST /batch/``.
+
+``compact`` removes the entries superseded by a later entry for the same
+object, which no consumer needs, and the delete entries older than a cutoff.
+Consumers that last synced before such a delete get a 410 and start over.
+
+``notifier`` wakes the long-polling readers of this process as soon as an
+entry commits; entries written by other processes are picked up every
+``CHANGES_POLL_INTERVAL`` seconds.
+"""
+import asyncio
+import threading
+
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef
+from django.utils import timezone
+
+from techtest.changes.models import Change, Compaction
+
+
+def record(model, pks, action):
+    """Append ``action`` entries for the ``model`` objects with the given pks."""
+    entity = str(model._meta.verbose_name_plural)
+    entries = [Change(entity=entity, object_id=pk, action=action) for pk in pks if pk is not None]
+    if entries:
+        Change.objects.bulk_create(entries)
+        transaction.on_commit(notifier.notify)
+
+
+def read(since, limit):
+    """``.values()`` rows of up to ``limit`` entries after ``since``, in order."""
+    return list(
+        Change.objects.filter(pk__gt=since)
+        .order_by("pk")
+        .values("id", "entity", "object_id", "action", "created_at")[:limit]
+    )
+
+
+def horizon():
+    """The newest expired delete entry; 0 if none ever expired."""
+    return Compaction.objects.aggregate(horizon=Max("horizon"))["horizon"] or 0
+
+
+def compact(keep_deletes, batch_size=1000):
+    """Remove superseded entries, then delete entries older than the
+    ``keep_deletes`` timedelta, ``batch_size`` at a time, each batch in its
+    own transaction. Returns ``(superseded, expired)`` counts."""
+    later = Change.objects.filter(
+        entity=OuterRef("entity"), object_id=OuterRef("object_id"), pk__gt=OuterRef("pk")
+    )
+    superseded = delete_in_batches(Change.objects.filter(Exists(later)), batch_size)
+    old_deletes = Change.objects.filter(
+        action=Change.DELETE, created_at__lt=timezone.now() - keep_deletes
+    )
+    expired = 0
+    newest = old_deletes.aggregate(newest=Max("pk"))["newest"]
+    if newest is not None:
+        # Recorded first, so that no consumer slips past a delete that is
+        # about to disappear
+        Compaction.objects.create(horizon=newest)
+        expired = delete_in_batches(old_deletes.filter(pk__lte=newest), batch_size)
+    return superseded, expired
+
+
+def delete_in_batches(queryset, batch_size):
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not pks:
+                return deleted
+            deleted += Change.objects.filter(pk__in=pks).delete()[0]
+
+
+class Notifier(object):
+    """Wakes the readers waiting for new entries, sync and async alike.
+
+    ``version`` moves on every commit that recorded entries. Readers take it
+    before querying and wait for it to move past that, so an entry committed
+    between their query and their wait isn't missed.
+    """
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.version = 0
+        # (event loop, asyncio.Event) of each waiting async reader
+        self.async_waiters = set()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+            waiters = list(self.async_waiters)
+        for loop, event in waiters:
+            loop.call_soon_threadsafe(event.set)
+
+    def wait(self, version, timeout):
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout)
+
+    async def async_wait(self, version, timeout):
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.condition:
+            if self.version != version:
+                return
+            self.async_waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self.condition:
+                self.async_waiters.discard(waiter)
+
+
+notifier = Notifier()
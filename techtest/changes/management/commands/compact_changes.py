@@ -0,0 +1,27 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from techtest.changes.log import compact
+
+
+class Command(BaseCommand):
+    help = "Drop superseded change feed entries and delete entries past their retention."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--keep-deletes", type=float, default=30, help="days to keep delete entries for"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=1000, help="entries deleted per transaction"
+        )
+
+    def handle(self, *args, **options):
+        superseded, expired = compact(
+            timedelta(days=options["keep_deletes"]), options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Removed {superseded} superseded and {expired} expired delete entries."
+            )
+        )
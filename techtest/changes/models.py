@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Change(models.Model):
+    """One entry of the change feed; its id is the feed's sequence number.
+
+    SQLite gives the id column AUTOINCREMENT, so ids are never reused once
+    compaction has removed the newest entries.
+    """
+
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    ACTIONS = [(CREATE, "Create"), (UPDATE, "Update"), (DELETE, "Delete")]
+
+    # "articles", "authors" or "regions", as in POST /batch/
+    entity = models.CharField(max_length=16)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=["entity", "object_id"], name="change_object_idx")]
+
+
+class Compaction(models.Model):
+    """A run of ``compact_changes`` that expired delete entries.
+
+    Consumers that last synced before ``horizon`` may have missed a delete.
+    """
+
+    horizon = models.BigIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
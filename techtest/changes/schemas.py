@@ -0,0 +1,28 @@
+from django.conf import settings
+from marshmallow import EXCLUDE, Schema, ValidationError, fields, validate
+from marshmallow.decorators import validates
+
+
+class ChangeSchema(Schema):
+    seq = fields.Integer(attribute="id")
+    entity = fields.String()
+    id = fields.Integer(attribute="object_id")
+    action = fields.String()
+    at = fields.DateTime(attribute="created_at")
+
+
+class ChangeFeedSchema(Schema):
+    """Query parameters of ``GET /changes/``."""
+
+    class Meta(object):
+        unknown = EXCLUDE
+
+    since = fields.Integer(load_default=0, validate=validate.Range(min=0))
+    limit = fields.Integer(load_default=100, validate=validate.Range(min=1, max=1000))
+    # Seconds to hold the request open while there is nothing after ``since``
+    wait = fields.Float(load_default=0)
+
+    @validates("wait")
+    def validate_wait(self, wait):
+        if not 0 <= wait <= settings.CHANGES_MAX_WAIT:
+            raise ValidationError(f"Must be between 0 and {settings.CHANGES_MAX_WAIT}.")
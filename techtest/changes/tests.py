@@ -0,0 +1,225 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from techtest.articles.models import Article
+from techtest.authors.models import Author
+from techtest.authors.schemas import AuthorSchema
+from techtest.changes.log import compact
+from techtest.changes.models import Change
+from techtest.regions.models import Region
+from techtest.workers import BLOCKING_WORKER
+
+
+def entries(response):
+    return [(change["entity"], change["id"], change["action"]) for change in response.json()]
+
+
+class ChangeFeedTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("changes")
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+
+    def send(self, method, url, payload=None):
+        return getattr(self.client, method)(
+            url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def test_logs_api_writes_in_order(self):
+        response = self.send(
+            "post", reverse("authors-list"), {"first_name": "Jane", "last_name": "Doe"}
+        )
+        jane = response.json()["id"]
+        response = self.send(
+            "post",
+            reverse("articles-list"),
+            {"title": "Logged", "author": jane, "regions": [{"id": self.region.id}]},
+        )
+        article = response.json()["id"]
+        article_url = reverse("article", kwargs={"article_id": article})
+        self.send("put", article_url, {"title": "Renamed"})
+        self.send("put", reverse("region", kwargs={"region_id": self.region.id}), {"code": "AL"})
+        self.client.delete(article_url)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            entries(response),
+            [
+                ("authors", jane, "create"),
+                # The new article, counted for its author, then linked to
+                # its region (within its create entry) and counted for it
+                ("authors", jane, "update"),
+                ("articles", article, "create"),
+                ("regions", self.region.id, "update"),
+                ("articles", article, "update"),
+                # The region, and the article that embeds it
+                ("articles", article, "update"),
+                ("regions", self.region.id, "update"),
+                # The delete, and the counts it lowered
+                ("articles", article, "delete"),
+                ("authors", jane, "update"),
+                ("regions", self.region.id, "update"),
+            ],
+        )
+        seqs = [change["seq"] for change in response.json()]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(set(response.json()[0]), {"seq", "entity", "id", "action", "at"})
+
+    def test_logs_authors_and_regions_created_by_article_writes(self):
+        response = self.send(
+            "post",
+            reverse("articles-list"),
+            {
+                "title": "Inline",
+                "author": {"first_name": "Jane", "last_name": "Doe"},
+                "regions": [{"code": "UK", "name": "United Kingdom"}],
+            },
+        )
+        article = response.json()["id"]
+        jane = Author.objects.get(first_name="Jane").id
+        kingdom = Region.objects.get(code="UK").id
+        self.assertEqual(
+            entries(self.client.get(self.url)),
+            [
+                ("regions", kingdom, "create"),
+                ("authors", jane, "create"),
+                ("authors", jane, "update"),
+                ("articles", article, "create"),
+                ("regions", kingdom, "update"),
+            ],
+        )
+
+    def test_logs_one_entry_for_an_update_of_columns_and_regions(self):
+        article = Article.objects.create(title="Both")
+        Change.objects.all().delete()
+        self.send(
+            "put",
+            reverse("article", kwargs={"article_id": article.id}),
+            {"title": "Renamed", "regions": [{"id": self.region.id}]},
+        )
+        self.assertEqual(
+            entries(self.client.get(self.url)),
+            [("articles", article.id, "update"), ("regions", self.region.id, "update")],
+        )
+        # Links changed on their own still log the article
+        self.send(
+            "put", reverse("article", kwargs={"article_id": article.id}), {"regions": []}
+        )
+        self.assertEqual(
+            entries(self.client.get(self.url))[2:],
+            [("articles", article.id, "update"), ("regions", self.region.id, "update")],
+        )
+
+    def test_leaves_no_entry_for_writes_that_change_nothing_or_fail(self):
+        article = Article.objects.create(title="Quiet")
+        Change.objects.all().delete()
+        self.send("put", reverse("article", kwargs={"article_id": article.id}), {"title": "Quiet"})
+        response = self.send("post", reverse("articles-bulk"), [{"title": "New"}, {"author": 9999}])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(self.url).json(), [])
+
+    def test_pages_with_since_and_limit(self):
+        for name in ("One", "Two", "Three"):
+            AuthorSchema().load({"first_name": name, "last_name": "Doe"})
+        response = self.client.get(self.url, {"limit": 2})
+        first_page = response.json()
+        self.assertEqual(len(first_page), 2)
+        next_url = response["Link"].split(";")[0].strip("<>")
+        self.assertIn(f"since={first_page[-1]['seq']}", next_url)
+        response = self.client.get(next_url)
+        self.assertEqual(len(response.json()), 1)
+        self.assertGreater(response.json()[0]["seq"], first_page[-1]["seq"])
+        # An empty read points back at the same position
+        last = response.json()[0]["seq"]
+        response = self.client.get(self.url, {"since": last})
+        self.assertEqual(response.json(), [])
+        self.assertIn(f"since={last}", response["Link"])
+
+    def test_rejects_invalid_parameters(self):
+        for params in ({"since": -1}, {"limit": 0}, {"limit": "x"}, {"wait": 3600}):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_compaction_keeps_the_latest_entry_per_object(self):
+        jane = AuthorSchema().load({"first_name": "Jane", "last_name": "Doe"})
+        AuthorSchema().load({"id": jane.id, "first_name": "Janet", "last_name": "Doe"})
+        self.client.delete(reverse("author", kwargs={"author_id": self.author.id}))
+        before = self.client.get(self.url).json()
+        self.assertEqual(compact(timedelta(days=30)), (1, 0))
+        self.assertEqual(
+            entries(self.client.get(self.url)),
+            [("authors", jane.id, "update"), ("authors", self.author.id, "delete")],
+        )
+        # Deletes past their retention go too, and consumers that may have
+        # missed them are told to resync
+        call_command("compact_changes", "--keep-deletes", "0", stdout=StringIO())
+        self.assertEqual(entries(self.client.get(self.url)), [("authors", jane.id, "update")])
+        response = self.client.get(self.url, {"since": before[0]["seq"]})
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(self.client.get(self.url, {"since": 0}).status_code, 200)
+        self.assertEqual(self.client.get(self.url, {"since": before[-1]["seq"]}).status_code, 200)
+
+
+class ChangeFeedLongPollTestCase(TransactionTestCase):
+    def setUp(self):
+        self.url = reverse("changes")
+
+    def write_later(self, delay):
+        def write():
+            time.sleep(delay)
+            AuthorSchema().load({"first_name": "Jane", "last_name": "Doe"})
+            connection.close()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        return thread
+
+    @override_settings(CHANGES_POLL_INTERVAL=0.05)
+    def test_returns_empty_once_the_wait_is_over(self):
+        start = time.monotonic()
+        response = self.client.get(self.url, {"wait": 0.2})
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(response.json(), [])
+        self.assertIn("since=0", response["Link"])
+
+    @override_settings(CHANGES_BLOCKING_MAX_WAIT=0.1)
+    def test_caps_the_wait_under_the_blocking_server(self):
+        start = time.monotonic()
+        response = self.client.get(self.url, {"wait": 5}, **{BLOCKING_WORKER: True})
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(response.json(), [])
+
+    @override_settings(CHANGES_POLL_INTERVAL=10)
+    def test_wakes_up_as_soon_as_an_entry_commits(self):
+        thread = self.write_later(0.1)
+        start = time.monotonic()
+        response = self.client.get(self.url, {"wait": 5})
+        thread.join()
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual([change["entity"] for change in response.json()], ["authors"])
+
+    @override_settings(
+        ROOT_URLCONF="techtest.async_urls",
+        MIDDLEWARE=["techtest.metrics.MetricsMiddleware"],
+        CHANGES_POLL_INTERVAL=10,
+    )
+    async def test_async_feed_waits_on_the_event_loop(self):
+        thread = self.write_later(0.1)
+        start = time.monotonic()
+        # Another request is served while the long poll waits
+        poll = asyncio.ensure_future(self.async_client.get(self.url + "?wait=5"))
+        response = await self.async_client.get(self.url + "?limit=1")
+        self.assertEqual(response.status_code, 200)
+        response = await poll
+        thread.join()
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual([change["action"] for change in response.json()], ["create"])
@@ -0,0 +1,62 @@
+import time
+
+from django.conf import settings
+from django.views.generic import View
+from marshmallow import ValidationError
+
+from techtest.changes.log import horizon, notifier, read
+from techtest.changes.schemas import ChangeFeedSchema, ChangeSchema
+from techtest.serializers import get_dumper
+from techtest.utils import json_response
+from techtest.workers import BLOCKING_WORKER
+
+
+def load_params(request):
+    """The validated query parameters, or the error response to send instead."""
+    try:
+        params = ChangeFeedSchema().load(request.GET)
+    except ValidationError as e:
+        return None, json_response(e.messages, 400)
+    # since=0 is a consumer starting from nothing, which has no deletes to miss
+    if 0 < params["since"] < horizon():
+        error = "Deletes after this sequence number were compacted away; resync from since=0."
+        return None, json_response({"error": error}, 410)
+    return params, None
+
+
+def feed_response(request, changes, since):
+    """The entries as a list, with a ``Link`` to where the next read starts."""
+    response = json_response(get_dumper(ChangeSchema).dump(changes, many=True))
+    query = request.GET.copy()
+    query["since"] = changes[-1]["id"] if changes else since
+    next_url = request.build_absolute_uri("?" + query.urlencode())
+    response["Link"] = '<{}>; rel="next"'.format(next_url)
+    return response
+
+
+class ChangesView(View):
+    """``GET /changes/?since=<seq>&limit=<n>&wait=<seconds>``: the entries after
+    ``since``, oldest first. With ``wait``, an empty read is held open until
+    an entry arrives or ``wait`` seconds have passed.
+
+    Where workers serve one request at a time (``manage.py serve --threads
+    1``) a waiting request would hold a whole worker, so ``wait`` is capped
+    at ``CHANGES_BLOCKING_MAX_WAIT`` there; the client just polls again
+    sooner.
+    """
+
+    def get(self, request, *args, **kwargs):
+        params, error = load_params(request)
+        if error is not None:
+            return error
+        wait = params["wait"]
+        if request.META.get(BLOCKING_WORKER):
+            wait = min(wait, settings.CHANGES_BLOCKING_MAX_WAIT)
+        deadline = time.monotonic() + wait
+        while True:
+            version = notifier.version
+            changes = read(params["since"], params["limit"])
+            remaining = deadline - time.monotonic()
+            if changes or remaining <= 0:
+                return feed_response(request, changes, params["since"])
+            notifier.wait(version, min(remaining, settings.CHANGES_POLL_INTERVAL))
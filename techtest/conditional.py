@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from techtest.asyncdb import database_sync_to_async
+
+
+def object_version(model, pk_kwarg):
+    """Validators for one object: its ``updated_at``, read without loading the row."""
+
+    def validators(request, **kwargs):
+        updated_at = (
+            model.objects.filter(pk=kwargs[pk_kwarg])
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if updated_at is None:
+            return None
+        return updated_at.isoformat(), updated_at
+
+    return validators
+
+
+def table_version(*models):
+    """Validators for a list: the newest ``updated_at`` plus the row count.
+
+    The count catches deletions, which leave no newer timestamp behind. Lists
+    that embed figures computed from other tables pass those models too, and
+    get one aggregate query per table. Lists carry no ``Last-Modified``:
+    deleting any row but the newest leaves ``Max(updated_at)`` unchanged, so
+    only the ETag can tell clients the list changed.
+    """
+
+    def validators(request, **kwargs):
+        versions = []
+        for model in models:
+            state = model.objects.aggregate(updated_at=Max("updated_at"), count=Count("pk"))
+            updated_at = state["updated_at"]
+            versions.append(
+                "{}:{}".format(updated_at.isoformat() if updated_at else "", state["count"])
+            )
+        return "|".join(versions), None
+
+    return validators
+
+
+def conditional_get(validators):
+    """View decorator adding ETag/Last-Modified and answering 304 Not Modified.
+
+    ``validators(request, **kwargs)`` returns ``(version, last_modified)`` or
+    None when the resource doesn't exist, and should be a single cheap query:
+    a matching If-None-Match / If-Modified-Since is answered without running
+    the view at all. The ETag hashes the version with the full request path,
+    since query parameters change the body. Async views get an async
+    wrapper that runs the validators off the event loop.
+    """
+
+    def decorator(view):
+        if asyncio.iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ("GET", "HEAD"):
+                    return await view(request, *args, **kwargs)
+                state = await database_sync_to_async(validators)(request, **kwargs)
+                response, etag, last_modified = evaluate_preconditions(request, state)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validator_headers(response, etag, last_modified)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            state = validators(request, **kwargs)
+            response, etag, last_modified = evaluate_preconditions(request, state)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return add_validator_headers(response, etag, last_modified)
+
+        return wrapper
+
+    return decorator
+
+
+def evaluate_preconditions(request, state):
+    """``(304 response or None, etag, last_modified)`` for the validator ``state``."""
+    if state is None:
+        return None, None, None
+    version, updated_at = state
+    digest = hashlib.md5("{}|{}".format(request.get_full_path(), version).encode()).hexdigest()
+    etag = quote_etag(digest)
+    last_modified = timegm(updated_at.utctimetuple()) if updated_at else None
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    return response, etag, last_modified
+
+
+def add_validator_headers(response, etag, last_modified):
+    if etag is not None and response.status_code in (200, 304):
+        response.setdefault("ETag", etag)
+        if last_modified is not None:
+            response.setdefault("Last-Modified", http_date(last_modified))
+    return response
@@ -0,0 +1,24 @@
+"""JSON encoders for ``json_response``: callables turning data into UTF-8 bytes.
+
+``settings.JSON_ENCODER`` names the one in use. The default picks orjson
+when it is installed and otherwise the C-accelerated stdlib encoder with
+compact separators.
+"""
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def stdlib_dumps(data):
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def orjson_dumps(data):
+    # Marshmallow keys the errors of list items by index
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+default_dumps = stdlib_dumps if orjson is None else orjson_dumps
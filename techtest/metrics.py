@@ -0,0 +1,239 @@
+"""Per-endpoint request metrics, exported in the Prometheus text format.
+
+``MetricsMiddleware`` records, for every request, labelled by resolved URL
+name and method: wall time, number and total time of SQL queries, response
+size and time spent serializing. Methods other than the standard HTTP verbs
+are labelled ``other``, so clients can't create series at will.
+``MetricsView`` serves the aggregated histograms at ``/metrics`` to callers
+that send ``Authorization: Bearer <METRICS_TOKEN>`` and to staff users.
+
+The metrics are prometheus_client ones and live in process memory. Under
+several worker processes, set ``PROMETHEUS_MULTIPROC_DIR`` to a directory
+they share (prometheus_client's multiprocess mode): each process then
+keeps its values in files there and ``/metrics`` sums them, whichever
+worker answers. ``manage.py serve`` empties the directory when it starts.
+
+Streamed responses are measured up to the point the view returns; the rows
+they stream later are not counted.
+"""
+import asyncio
+import hmac
+import os
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http.response import HttpResponse, HttpResponseForbidden
+from django.views.generic import View
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100, 250)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+HISTOGRAMS = {
+    "techtest_request_duration_seconds": ("Wall time spent handling the request.", SECONDS_BUCKETS),
+    "techtest_request_db_queries": ("SQL queries run by the request.", QUERY_BUCKETS),
+    "techtest_request_db_duration_seconds": ("Time spent in SQL queries.", SECONDS_BUCKETS),
+    "techtest_response_size_bytes": ("Size of the response body.", BYTES_BUCKETS),
+    "techtest_serialization_duration_seconds": (
+        "Time spent dumping and encoding the response data.",
+        SECONDS_BUCKETS,
+    ),
+}
+RESPONSES = "techtest_responses_total"
+LABELS = ("view", "method")
+METHODS = frozenset(("GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"))
+
+
+class Registry(object):
+    """Histograms and the response counter, labelled by view and method."""
+
+    def __init__(self):
+        self.collectors = CollectorRegistry(auto_describe=True)
+        self.histograms = {
+            name: Histogram(name, help_text, LABELS, buckets=buckets, registry=self.collectors)
+            for name, (help_text, buckets) in HISTOGRAMS.items()
+        }
+        self.responses = Counter(
+            RESPONSES, "Responses by status code.", LABELS + ("status",), registry=self.collectors
+        )
+
+    def clear(self):
+        for metric in (*self.histograms.values(), self.responses):
+            metric.clear()
+
+    def record(self, labels, status, observations):
+        for name, value in observations.items():
+            self.histograms[name].labels(*labels).observe(value)
+        self.responses.labels(*labels, status).inc()
+
+    def value(self, name, labels, **extra):
+        """The current value of one sample in this process, e.g. for
+        ``techtest_request_duration_seconds_count``."""
+        return self.collectors.get_sample_value(name, {**dict(zip(LABELS, labels)), **extra})
+
+    def render(self):
+        if multiprocess_dir():
+            collectors = CollectorRegistry()
+            multiprocess.MultiProcessCollector(collectors)
+        else:
+            collectors = self.collectors
+        return generate_latest(collectors)
+
+
+def multiprocess_dir():
+    return os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+
+def clear_multiprocess_dir():
+    """Remove the files of an earlier run, before any worker starts."""
+    directory = multiprocess_dir()
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.endswith(".db"):
+                os.remove(os.path.join(directory, name))
+
+
+def mark_process_dead(pid):
+    """Tell prometheus_client a worker exited; its counts stay in the totals."""
+    if multiprocess_dir():
+        multiprocess.mark_process_dead(pid)
+
+
+registry = Registry()
+
+
+class RequestStats(object):
+    """What the current request has spent so far; filled in by the DB wrapper
+    and by ``serializing``."""
+
+    __slots__ = ("queries", "db_time", "serialization", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization = 0.0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - start
+
+
+current_stats = ContextVar("current_stats", default=None)
+
+
+def serializing(func, *args, **kwargs):
+    """Call ``func`` and charge its time to the current request's serialization.
+
+    Nested calls (a dumper dumping an embedded author) are timed once, by the
+    outermost call.
+    """
+    stats = current_stats.get()
+    if stats is None or stats.serializing:
+        return func(*args, **kwargs)
+    stats.serializing = True
+    start = time.perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        stats.serializing = False
+        stats.serialization += time.perf_counter() - start
+
+
+def db_instrumentation():
+    """Count the queries this thread runs into the current request's stats.
+
+    For ORM work that async views hand to other threads; the counts are
+    approximate when several of those threads run queries at once.
+    """
+    stats = current_stats.get()
+    return nullcontext() if stats is None else connection.execute_wrapper(stats)
+
+
+class MetricsMiddleware(object):
+    """Record per-endpoint metrics for every request; list it first in MIDDLEWARE."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Tells Django this instance is async, like MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(stats):
+                response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        # Queries run on other threads here and are counted through
+        # db_instrumentation
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, stats, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, stats, duration):
+        match = request.resolver_match
+        view = match.url_name if match and match.url_name else "unmatched"
+        if view != "metrics":
+            observations = {
+                "techtest_request_duration_seconds": duration,
+                "techtest_request_db_queries": stats.queries,
+                "techtest_request_db_duration_seconds": stats.db_time,
+                "techtest_serialization_duration_seconds": stats.serialization,
+            }
+            if not response.streaming:
+                observations["techtest_response_size_bytes"] = len(response.content)
+            method = request.method if request.method in METHODS else "other"
+            registry.record((view, method), response.status_code, observations)
+
+
+class MetricsView(View):
+    def get(self, request, *args, **kwargs):
+        if not self.is_authorized(request):
+            return HttpResponseForbidden()
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE_LATEST)
+
+    def is_authorized(self, request):
+        token = settings.METRICS_TOKEN
+        scheme, _, value = request.META.get("HTTP_AUTHORIZATION", "").partition(" ")
+        if token and scheme.lower() == "bearer" and hmac.compare_digest(value.encode(), token.encode()):
+            return True
+        user = getattr(request, "user", None)
+        return bool(user and user.is_staff)
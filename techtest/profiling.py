@@ -0,0 +1,156 @@
+"""Opt-in cProfile capture of single requests.
+
+An authorized caller sends ``X-Profile: <token>`` (or ``?profile=<token>``);
+staff users may send any value. The view then runs under cProfile and three
+files named after the profile id land in ``PROFILING_DIR``:
+
+- ``<id>.prof``: pstats data, for ``python -m pstats`` or snakeviz
+- ``<id>.collapsed``: folded stacks for flamegraph.pl / speedscope
+- ``<id>.json``: method, path, view and timings of the request
+
+Only the newest ``PROFILING_KEEP`` profiles are kept. The id is returned in
+the ``X-Profile-Id`` response header; ``python manage.py profiles`` lists and
+summarizes them. The middleware is only installed when ``PROFILING_ENABLED``
+is set, and profiles the view alone, not the middleware around it.
+"""
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = "HTTP_X_PROFILE"
+PROFILE_PARAM = "profile"
+
+
+def profile_ids():
+    """Ids of the stored profiles, oldest first."""
+    try:
+        names = os.listdir(settings.PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    return sorted(name[: -len(".prof")] for name in names if name.endswith(".prof"))
+
+
+def profile_path(profile_id, extension):
+    return os.path.join(settings.PROFILING_DIR, profile_id + extension)
+
+
+def load_profile(profile_id):
+    """The ``.json`` metadata of a stored profile."""
+    with open(profile_path(profile_id, ".json")) as f:
+        return json.load(f)
+
+
+def prune_profiles(keep):
+    for profile_id in profile_ids()[:-keep or None]:
+        for extension in (".prof", ".collapsed", ".json"):
+            try:
+                os.remove(profile_path(profile_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+def frame_label(func):
+    filename, lineno, name = func
+    if filename == "~":
+        label = name
+    else:
+        label = f"{name} ({os.path.basename(filename)}:{lineno})"
+    return label.replace(";", ",")
+
+
+def collapsed_stacks(stats, min_fraction=0.0001):
+    """Fold cProfile's call graph into ``frame;frame;frame <microseconds>`` lines.
+
+    cProfile records caller/callee edges, not whole stacks, so the time below
+    a function is split between its call paths in proportion to the time of
+    each incoming edge. Paths under ``min_fraction`` of the total are dropped.
+    """
+    children = {}
+    roots = []
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        if not callers:
+            roots.append(func)
+        for caller, (_, _, _, cumulative) in callers.items():
+            children.setdefault(caller, []).append((func, cumulative))
+    threshold = stats.total_tt * min_fraction
+    folded = Counter()
+
+    def walk(func, stack, seconds):
+        _, _, own, cumulative, _ = stats.stats[func]
+        stack = stack + (func,)
+        share = seconds / cumulative if cumulative else 0
+        folded[stack] += own * share
+        for child, edge in children.get(func, ()):
+            if child not in stack and edge * share >= threshold:
+                walk(child, stack, edge * share)
+
+    for root in roots:
+        walk(root, (), stats.stats[root][3])
+    return [
+        "{} {}".format(";".join(frame_label(func) for func in stack), round(seconds * 1e6))
+        for stack, seconds in folded.items()
+        if round(seconds * 1e6)
+    ]
+
+
+class ProfilingMiddleware(object):
+    """Run authorized, opted-in requests' views under cProfile.
+
+    Must come after AuthenticationMiddleware so staff users can be recognized.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def is_authorized(self, request, value):
+        token = settings.PROFILING_TOKEN
+        if token and hmac.compare_digest(value.encode(), token.encode()):
+            return True
+        user = getattr(request, "user", None)
+        return bool(user and user.is_staff)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        value = request.META.get(PROFILE_HEADER) or request.GET.get(PROFILE_PARAM)
+        if not value or not self.is_authorized(request, value):
+            return None
+        profiler = cProfile.Profile()
+        start = time.perf_counter()
+        response = profiler.runcall(view_func, request, *view_args, **view_kwargs)
+        duration = time.perf_counter() - start
+        response["X-Profile-Id"] = self.save(request, profiler, response, duration)
+        return response
+
+    def save(self, request, profiler, response, duration):
+        profile_id = "{:%Y%m%dT%H%M%S%f}-{}".format(datetime.now(), uuid.uuid4().hex[:8])
+        os.makedirs(settings.PROFILING_DIR, exist_ok=True)
+        profiler.dump_stats(profile_path(profile_id, ".prof"))
+        stats = pstats.Stats(profiler)
+        with open(profile_path(profile_id, ".collapsed"), "w") as f:
+            f.writelines(line + "\n" for line in collapsed_stacks(stats))
+        metadata = {
+            "id": profile_id,
+            "method": request.method,
+            "path": request.get_full_path(),
+            "view": request.resolver_match.url_name if request.resolver_match else None,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "profiled_ms": round(stats.total_tt * 1000, 3),
+        }
+        with open(profile_path(profile_id, ".json"), "w") as f:
+            json.dump(metadata, f)
+        prune_profiles(settings.PROFILING_KEEP)
+        return profile_id
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RegionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'techtest.regions'
+
+    def ready(self):
+        from techtest.regions import signals  # noqa: F401
@@ -0,0 +1,47 @@
+"""Async versions of the region list and detail views, for the ASGI entry point.
+
+Reads are served here with the ORM work offloaded to the database threads;
+writes are handed to the sync views in techtest/regions/views.py.
+"""
+from marshmallow import ValidationError
+
+from techtest.regions.models import Region
+from techtest.regions.schemas import RegionSchema
+from techtest.regions.views import RegionView, RegionsListView
+from techtest.asyncdb import database_sync_to_async, sync_view
+from techtest.cache import cache_response
+from techtest.conditional import conditional_get, object_version, table_version
+from techtest.pagination import ASYNC_EXPORT_ERROR
+from techtest.serializers import get_dumper
+from techtest.utils import dumped_values, json_response, requested_fields
+
+
+@conditional_get(table_version(Region))
+async def regions_list(request):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(RegionsListView)(request)
+    paginator = RegionsListView()
+    if paginator.wants_export(request):
+        return json_response(ASYNC_EXPORT_ERROR, 400)
+    try:
+        serializer, queryset = paginator.list_queryset(request)
+        regions = await database_sync_to_async(paginator.paginate_queryset)(request, queryset)
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    return paginator.paginated_response(request, serializer.dump(regions, many=True))
+
+
+@cache_response(Region, "region_id")
+@conditional_get(object_version(Region, "region_id"))
+async def region_detail(request, region_id):
+    if request.method not in ("GET", "HEAD"):
+        return await sync_view(RegionView)(request, region_id=region_id)
+    try:
+        serializer = get_dumper(RegionSchema, requested_fields(request, RegionSchema))
+    except ValidationError as e:
+        return json_response(e.messages, 400)
+    queryset = dumped_values(Region.objects.filter(pk=region_id), serializer.schema)
+    regions = await database_sync_to_async(list)(queryset)
+    if not regions:
+        return json_response({"error": "No Region matches the given query"}, 404)
+    return json_response(serializer.dump(regions[0]))
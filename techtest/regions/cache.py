@@ -0,0 +1,146 @@
+"""In-process cache of the regions table, indexed by id and by code.
+
+Regions are a small, nearly static lookup table, so every process keeps the
+whole table in memory and article writes and list reads resolve regions
+without touching the database.
+
+The table is reloaded whenever the generation stored in
+``REGION_CACHE_ALIAS`` changes. ``region_cache.invalidate()`` bumps it; the
+signal handlers in techtest/regions/signals.py call it on every region save
+and delete, and bulk writes that skip signals call it themselves. With a
+cache backend shared between processes (memcached, redis, the file cache)
+the other workers see the bump on their next snapshot; with the default
+locmem cache only the writing process does, and the others reload once
+their snapshot is ``REGION_CACHE_MAX_AGE`` seconds old.
+
+Checking the generation is a cache read (a file read, with the file
+cache), so code that resolves many regions takes one ``snapshot()`` and
+looks them all up in it.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, transaction
+
+from techtest.regions.models import Region
+
+GENERATION_KEY = "regions:generation"
+# Not article_count and updated_at, which move with every article write
+CACHED_FIELDS = ("id", "code", "name")
+
+
+def generation_cache():
+    return caches[settings.REGION_CACHE_ALIAS]
+
+
+class Snapshot(object):
+    """The regions table as of one generation; never changes once loaded."""
+
+    __slots__ = ("generation", "by_id", "by_code", "loaded_at")
+
+    def __init__(self, generation, by_id, by_code):
+        self.generation = generation
+        self.by_id = by_id
+        self.by_code = by_code
+        self.loaded_at = time.monotonic()
+
+    def is_current(self, generation):
+        return (
+            self.generation == generation
+            and time.monotonic() - self.loaded_at < settings.REGION_CACHE_MAX_AGE
+        )
+
+    def get(self, pk):
+        """The region with primary key ``pk``, as a fresh model instance (with
+        only ``CACHED_FIELDS`` loaded), or None."""
+        return as_region(self.by_id.get(pk))
+
+    def get_by_code(self, code):
+        return as_region(self.by_code.get(code))
+
+    def rows_by_id(self):
+        """``{id: {field: value}}`` of every region; treat it as read-only."""
+        return self.by_id
+
+
+class RegionCache(object):
+    def __init__(self):
+        self.lock = threading.Lock()
+        # The current Snapshot, swapped in whole
+        self.state = None
+
+    def snapshot(self):
+        """The current table, reloaded first if the shared generation moved or
+        the loaded one is too old."""
+        generation = generation_cache().get(GENERATION_KEY)
+        state = self.state
+        if state is None or not state.is_current(generation):
+            with self.lock:
+                state = self.state
+                if state is None or not state.is_current(generation):
+                    # The generation is read before the rows, so a write
+                    # landing in between triggers another reload
+                    state = self.state = Snapshot(generation, *self.load())
+        return state
+
+    def load(self):
+        by_id, by_code = {}, {}
+        for values in Region.objects.values_list(*CACHED_FIELDS):
+            row = dict(zip(CACHED_FIELDS, values))
+            by_id[row["id"]] = by_code[row["code"]] = row
+        return by_id, by_code
+
+    def warm(self):
+        """Load the table up front, e.g. before a server forks its workers.
+
+        Missing tables (a database that isn't migrated yet) leave the cache
+        to load on first use. The connection is closed again so forked
+        workers don't share it.
+        """
+        try:
+            self.snapshot()
+        except DatabaseError:
+            pass
+        finally:
+            connection.close()
+
+    def invalidate(self):
+        """Drop this process's copy and bump the shared generation, now and
+        again once the surrounding transaction commits.
+
+        A lookup made later in the same transaction caches its uncommitted
+        rows; if that transaction rolls back they stay cached until the next
+        region write.
+        """
+        self.state = None
+        bump_generation()
+        transaction.on_commit(bump_generation)
+
+    # Single lookups, each against a fresh snapshot
+
+    def get(self, pk):
+        return self.snapshot().get(pk)
+
+    def get_by_code(self, code):
+        return self.snapshot().get_by_code(code)
+
+    def rows_by_id(self):
+        return self.snapshot().rows_by_id()
+
+
+def bump_generation():
+    # A random value rather than a counter: nothing to lose if the key is
+    # evicted, and no read-modify-write race between processes
+    generation_cache().set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def as_region(row):
+    if row is None:
+        return None
+    return Region.from_db(DEFAULT_DB_ALIAS, list(row), list(row.values()))
+
+
+region_cache = RegionCache()
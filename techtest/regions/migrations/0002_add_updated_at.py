@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-17 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('regions', '0001_schema__initial_model_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='region',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
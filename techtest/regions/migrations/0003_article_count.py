@@ -0,0 +1,33 @@
+# Generated by Django 3.2.7 on 2026-10-17 03:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('regions', '0002_add_updated_at'),
+        ('articles', '0001_schema__initial_model_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='region',
+            name='article_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='region',
+            index=models.Index(fields=['article_count'], name='region_article_count_idx'),
+        ),
+        # Start from the current counts; later writes keep them up to date
+        migrations.RunSQL(
+            """
+            UPDATE "regions_region" SET "article_count" = (
+                SELECT COUNT(*) FROM "articles_article_regions"
+                WHERE "articles_article_regions"."region_id" = "regions_region"."id"
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
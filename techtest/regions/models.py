@@ -4,4 +4,19 @@ from django.db import models
 class Region(models.Model):
     code = models.CharField(max_length=2, unique=True)
     name = models.CharField(max_length=255)
-    
\ No newline at end of file
+    # Maintained by techtest/articles/counters.py
+    article_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["article_count"], name="region_article_count_idx")]
+
+    def save(self, *args, **kwargs):
+        # Same as Author.save: an update never writes the stored count
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "article_count"
+            ]
+        super().save(*args, **kwargs)
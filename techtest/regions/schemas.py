@@ -1,9 +1,13 @@
+from django.db import transaction
 from marshmallow import validate
 from marshmallow import fields
 from marshmallow import Schema
-from marshmallow.decorators import post_load
+from marshmallow import ValidationError
+from marshmallow.decorators import post_load, pre_load, validates_schema
 
 from techtest.regions.models import Region
+from techtest.changes.log import record
+from techtest.changes.models import Change
 
 
 class RegionLiteSchema(Schema):
@@ -12,6 +16,19 @@ class RegionLiteSchema(Schema):
     name = fields.String(validate=validate.Length(max=255))
     code = fields.String(required=True, validate=validate.Length(equal=2))
     
+class RegionReferenceSchema(Schema):
+    """Points at an existing region by id, or at a region by code (created if missing)."""
+
+    id = fields.Integer()
+    code = fields.String(validate=validate.Length(equal=2))
+    name = fields.String(validate=validate.Length(max=255))
+
+    @validates_schema
+    def validate_reference(self, data, **kwargs):
+        if data.get("id") is None and not data.get("code"):
+            raise ValidationError("Either an id or a code is required.")
+
+
 class RegionSchema(Schema):
     class Meta(object):
         model = Region
@@ -19,10 +36,20 @@ class RegionSchema(Schema):
     id = fields.Integer()
     code = fields.String(required=True, validate=validate.Length(equal=2))
     name = fields.String(validate=validate.Length(max=255))
+    article_count = fields.Integer(dump_only=True)
+
+    @pre_load
+    def drop_article_count(self, data, **kwargs):
+        # Read-only, like AuthorSchema.article_count
+        if isinstance(data, dict):
+            data = {name: value for name, value in data.items() if name != "article_count"}
+        return data
 
     @post_load
+    @transaction.atomic(savepoint=False)
     def update_or_create(self, data, *args, **kwargs):
-        region, _ = Region.objects.update_or_create(
+        region, created = Region.objects.update_or_create(
             id=data.pop("id", None), defaults=data
         )
+        record(Region, [region.pk], Change.CREATE if created else Change.UPDATE)
         return region
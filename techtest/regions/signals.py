@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from techtest.cache import invalidate
+from techtest.regions.cache import region_cache
+from techtest.regions.models import Region
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+def invalidate_region(sender, instance, **kwargs):
+    invalidate(Region, [instance.pk])
+    region_cache.invalidate()
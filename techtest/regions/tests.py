@@ -1,9 +1,15 @@
 import json
+from unittest import mock
 
-from django.test import TestCase
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from techtest.articles.models import Article
+from techtest.regions.cache import bump_generation, generation_cache, region_cache
 from techtest.regions.models import Region
+from techtest.cache import response_cache
 
 
 class RegionListViewTestCase(TestCase):
@@ -22,15 +28,50 @@ class RegionListViewTestCase(TestCase):
                     "id": self.region_1.id,
                     "code": "AL",
                     "name": "Albania",
+                    "article_count": 0,
                 },
                 {
                     "id": self.region_2.id,
                     "code": "UK",
                     "name": "United Kingdom",
+                    "article_count": 0,
                 },
             ],
         )
 
+    def test_paginates_with_cursor_and_next_link(self):
+        response = self.client.get(self.url, {"limit": 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([region["id"] for region in response.json()], [self.region_1.id])
+        next_url = response["Link"].split(";")[0].strip("<>")
+        response = self.client.get(next_url)
+        self.assertEqual([region["id"] for region in response.json()], [self.region_2.id])
+        self.assertFalse(response.has_header("Link"))
+
+    def test_orders_by_stored_article_count_in_one_query(self):
+        Article.objects.create(title="Counted").regions.set([self.region_2])
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {"ordering": "-article_count", "fields": "code"})
+        self.assertEqual(response.json(), [{"code": "UK"}, {"code": "AL"}])
+
+    def test_streams_ndjson_export(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)["code"] for line in lines], ["AL", "UK"]
+        )
+
+    def test_serializes_only_requested_fields(self):
+        response = self.client.get(self.url, {"fields": "code"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json(),
+            [{"code": "AL"}, {"code": "UK"}],
+        )
+        response = self.client.get(self.url, {"fields": "password"})
+        self.assertEqual(response.status_code, 400)
+
     def test_creates_new_region(self):
         payload = {
             "code": "US",
@@ -48,6 +89,7 @@ class RegionListViewTestCase(TestCase):
                 "id": region.id,
                 "code": "US",
                 "name": "United States of America",
+                "article_count": 0,
             },
             response.json(),
         )
@@ -67,6 +109,7 @@ class RegionViewTestCase(TestCase):
                 "id": self.region.id,
                 "code": "AL",
                 "name": "Albania",
+                "article_count": 0,
             },
         )
 
@@ -88,11 +131,139 @@ class RegionViewTestCase(TestCase):
                 "id": region.id,
                 "code": "US",
                 "name": "United States of America",
+                "article_count": 0,
             },
             response.json(),
         )
 
+    def test_serves_repeat_reads_from_cache_until_updated(self):
+        response_cache().clear()
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.client.put(
+            self.url,
+            data=json.dumps({"code": "AL", "name": "Republic of Albania"}),
+            content_type="application/json",
+        )
+        self.assertEqual(self.client.get(self.url).json()["name"], "Republic of Albania")
+
+    def test_answers_conditional_get_until_updated(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.client.put(
+            self.url,
+            data=json.dumps({"code": "AL", "name": "Republic of Albania"}),
+            content_type="application/json",
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
     def test_removes_region(self):
         response = self.client.delete(self.url)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Region.objects.count(), 0)
+
+
+@override_settings(
+    ROOT_URLCONF="techtest.async_urls", MIDDLEWARE=["techtest.metrics.MetricsMiddleware"]
+)
+class RegionAsyncViewsTestCase(TransactionTestCase):
+    def setUp(self):
+        response_cache().clear()
+        self.region = Region.objects.create(code="AL", name="Albania")
+        Region.objects.create(code="UK", name="United Kingdom")
+        self.url = reverse("region", kwargs={"region_id": self.region.id})
+
+    async def test_serves_reads_and_hands_writes_to_the_sync_views(self):
+        response = await self.async_client.get(reverse("regions-list") + "?limit=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{"id": self.region.id, "code": "AL", "name": "Albania", "article_count": 0}])
+        self.assertIn('rel="next"', response["Link"])
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {"id": self.region.id, "code": "AL", "name": "Albania", "article_count": 0})
+        response = await self.async_client.put(
+            self.url, {"code": "AL", "name": "Shqiperia"}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response.json(), {"id": self.region.id, "code": "AL", "name": "Shqiperia", "article_count": 0})
+
+
+class RegionCacheTestCase(TestCase):
+    def setUp(self):
+        self.region = Region.objects.create(code="AL", name="Albania")
+
+    def region_queries(self, queries):
+        # Reads only: article writes still update the stored article counts
+        return [
+            query["sql"]
+            for query in queries
+            if '"regions_region"' in query["sql"] and query["sql"].startswith("SELECT")
+        ]
+
+    def test_looks_regions_up_by_id_and_code_without_queries(self):
+        region_cache.snapshot()
+        with self.assertNumQueries(0):
+            self.assertEqual(region_cache.get(self.region.id), self.region)
+            self.assertEqual(region_cache.get_by_code("AL").name, "Albania")
+            self.assertIsNone(region_cache.get_by_code("UK"))
+
+    def test_snapshots_read_the_generation_once(self):
+        snapshot = region_cache.snapshot()
+        with mock.patch("techtest.regions.cache.generation_cache") as check:
+            self.assertEqual(snapshot.get(self.region.id), self.region)
+            self.assertEqual(snapshot.get_by_code("AL").name, "Albania")
+            self.assertEqual(list(snapshot.rows_by_id()), [self.region.id])
+        check.assert_not_called()
+        # One check for the whole batch, however many references it holds
+        payload = [
+            {"title": f"Bulk {n}", "regions": [{"id": self.region.id}, {"code": "AL"}]}
+            for n in range(3)
+        ]
+        with mock.patch(
+            "techtest.regions.cache.generation_cache", wraps=generation_cache
+        ) as check:
+            response = self.client.post(
+                reverse("articles-bulk"), data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 201)
+        check.assert_called_once()
+
+    def test_follows_saves_deletes_and_other_processes(self):
+        region_cache.snapshot()
+        self.region.name = "Shqiperia"
+        self.region.save()
+        self.assertEqual(region_cache.get(self.region.id).name, "Shqiperia")
+        # Another process writing: only the shared generation moves on
+        Region.objects.filter(pk=self.region.pk).update(name="Albania")
+        self.assertEqual(region_cache.get(self.region.id).name, "Shqiperia")
+        bump_generation()
+        self.assertEqual(region_cache.get(self.region.id).name, "Albania")
+        self.region.delete()
+        self.assertIsNone(region_cache.get_by_code("AL"))
+
+    def test_reloads_snapshots_past_their_max_age(self):
+        region_cache.snapshot()
+        # Another process writing, its generation bump unseen here
+        Region.objects.filter(pk=self.region.pk).update(name="Shqiperia")
+        self.assertEqual(region_cache.get(self.region.id).name, "Albania")
+        with override_settings(REGION_CACHE_MAX_AGE=0):
+            self.assertEqual(region_cache.get(self.region.id).name, "Shqiperia")
+
+    def test_article_writes_resolve_cached_regions_without_reading_them(self):
+        region_cache.snapshot()
+        payload = {"title": "Cached", "regions": [{"id": self.region.id}, {"code": "AL"}]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("articles-list"), data=json.dumps(payload), content_type="application/json"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["regions"], [{"code": "AL", "name": "Albania"}])
+        self.assertEqual(self.region_queries(queries), [])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("articles-list"))
+        self.assertEqual(response.json()[0]["regions"], [{"code": "AL", "name": "Albania"}])
+        self.assertEqual(self.region_queries(queries), [])
@@ -1,44 +1,83 @@
 import json
 
 from marshmallow import ValidationError
+from django.db import transaction
+from django.utils.decorators import method_decorator
 from django.views.generic import View
 
 from techtest.regions.models import Region
 from techtest.regions.schemas import RegionSchema
-from techtest.utils import json_response
+from techtest.cache import cache_response
+from techtest.changes.log import record
+from techtest.changes.models import Change
+from techtest.conditional import conditional_get, object_version, table_version
+from techtest.pagination import CursorPaginationMixin
+from techtest.serializers import get_dumper
+from techtest.utils import dumped_values, json_response, only_dumped_fields, requested_fields
 
 
-class RegionsListView(View):
+@method_decorator(conditional_get(table_version(Region)), name="dispatch")
+class RegionsListView(CursorPaginationMixin, View):
+    ordering_fields = ("article_count",)
+
     def get(self, request, *args, **kwargs):
-        return json_response(RegionSchema().dump(Region.objects.all(), many=True))
+        try:
+            serializer, queryset = self.list_queryset(request)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        if self.wants_export(request):
+            return self.export_response(queryset, serializer)
+        try:
+            regions = self.paginate_queryset(request, queryset)
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        return self.paginated_response(request, serializer.dump(regions, many=True))
+
+    def list_queryset(self, request):
+        """The dumper and the ``.values()`` queryset for a list request."""
+        serializer = get_dumper(RegionSchema, requested_fields(request, RegionSchema))
+        ordering = self.get_ordering(request)
+        extra = ()
+        if ordering and ordering[0] not in serializer.schema.dump_fields:
+            extra = (ordering[0],)
+        return serializer, dumped_values(Region.objects.all(), serializer.schema, *extra)
 
     def post(self, request, *args, **kwargs):
         try:
             region = RegionSchema().load(json.loads(request.body))
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(RegionSchema().dump(region), 201)
+        return json_response(get_dumper(RegionSchema).dump(region), 201)
 
 
+@method_decorator(cache_response(Region, "region_id"), name="dispatch")
+@method_decorator(conditional_get(object_version(Region, "region_id")), name="dispatch")
 class RegionView(View):
     def dispatch(self, request, region_id, *args, **kwargs):
         try:
-            self.region = Region.objects.get(pk=region_id)
+            fields = requested_fields(request, RegionSchema) if request.method == "GET" else None
+        except ValidationError as e:
+            return json_response(e.messages, 400)
+        self.serializer = get_dumper(RegionSchema, fields)
+        try:
+            self.region = only_dumped_fields(Region.objects.all(), self.serializer.schema).get(pk=region_id)
         except Region.DoesNotExist:
             return json_response({"error": "No Region matches the given query"}, 404)
         self.data = request.body and dict(json.loads(request.body), id=self.region.id)
         return super(RegionView, self).dispatch(request, *args, **kwargs)
 
     def get(self, request, *args, **kwargs):
-        return json_response(RegionSchema().dump(self.region))
+        return json_response(self.serializer.dump(self.region))
 
     def put(self, request, *args, **kwargs):
         try:
             self.region = RegionSchema().load(self.data)
         except ValidationError as e:
             return json_response(e.messages, 400)
-        return json_response(RegionSchema().dump(self.region))
+        return json_response(get_dumper(RegionSchema).dump(self.region))
 
+    @transaction.atomic
     def delete(self, request, *args, **kwargs):
+        record(Region, [self.region.pk], Change.DELETE)
         self.region.delete()
         return json_response()
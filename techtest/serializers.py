@@ -0,0 +1,117 @@
+"""Shared schema instances and compiled dumpers for the read paths.
+
+Dumping never mutates a marshmallow schema, so one instance per schema class
+and projection can serve every request and thread. ``Dumper`` goes a step
+further and compiles the schema's dump fields into a plain Python function,
+skipping marshmallow's per-field dispatch while producing the same output.
+Loading still needs a fresh schema per call, since it reads ``context``.
+"""
+from functools import lru_cache
+
+from marshmallow import fields
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+from marshmallow.utils import ensure_text_type, missing
+
+from techtest.metrics import serializing
+
+
+# Bounds the projections kept per process; requested_fields() normalizes
+# client input so that each subset of fields takes a single entry
+CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_schema(schema_class, only=None):
+    """Shared instance of ``schema_class``, for dumping only. ``only`` must be a tuple."""
+    return schema_class(only=only)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def get_dumper(schema_class, only=None):
+    """Shared compiled ``Dumper`` for ``schema_class``. ``only`` must be a tuple."""
+    return Dumper(get_schema(schema_class, only))
+
+
+def compile_dump_function(schema, mapping):
+    """Generate ``dump(obj) -> dict`` for one schema.
+
+    ``mapping`` selects key lookups (``.values()`` rows) instead of attribute
+    lookups (model instances). Integer and String fields are inlined; Method
+    fields call the schema's bound method; any other field falls back to its
+    own ``serialize``. As with marshmallow, values missing from the object
+    are left out of the result.
+    """
+    namespace = {
+        "missing": missing,
+        "ensure_text_type": ensure_text_type,
+        "accessor": schema.get_attribute,
+    }
+    lines = ["def dump(obj):", "    ret = {}"]
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attr = field.attribute or name
+        if isinstance(field, fields.Method):
+            if field.serialize_method_name is None:
+                continue
+            namespace[f"method_{index}"] = getattr(schema, field.serialize_method_name)
+            lines.append(f"    ret[{key!r}] = method_{index}(obj)")
+            continue
+        simple = (
+            type(field) in (fields.Integer, fields.String)
+            and field.dump_default is missing
+            and "." not in attr
+            and not (isinstance(field, fields.Integer) and field.as_string)
+        )
+        if not simple:
+            namespace[f"field_{index}"] = field
+            lines += [
+                f"    value = field_{index}.serialize({attr!r}, obj, accessor=accessor)",
+                "    if value is not missing:",
+                f"        ret[{key!r}] = value",
+            ]
+            continue
+        if mapping:
+            lines.append(f"    value = obj.get({attr!r}, missing)")
+        else:
+            lines.append(f"    value = getattr(obj, {attr!r}, missing)")
+        if type(field) is fields.Integer:
+            convert = "int(value)"
+        else:
+            convert = "value if value.__class__ is str else ensure_text_type(value)"
+        lines += [
+            "    if value is not missing:",
+            f"        ret[{key!r}] = None if value is None else {convert}",
+        ]
+    lines.append("    return ret")
+    exec("\n".join(lines), namespace)
+    return namespace["dump"]
+
+
+class Dumper(object):
+    """Drop-in for ``schema.dump`` built once from the schema's field declarations.
+
+    Accepts model instances and ``.values()`` dicts alike. Schemas with
+    pre/post-dump hooks aren't supported.
+    """
+
+    def __init__(self, schema):
+        if schema._has_processors(PRE_DUMP) or schema._has_processors(POST_DUMP):
+            raise ValueError(f"{type(schema).__name__} has dump hooks and can't be compiled")
+        self.schema = schema
+        self.dump_object = compile_dump_function(schema, mapping=False)
+        self.dump_mapping = compile_dump_function(schema, mapping=True)
+
+    def dump(self, obj, many=False):
+        return serializing(self.dump_unmetered, obj, many)
+
+    def dump_unmetered(self, obj, many=False):
+        if not many:
+            return self.dump_function(obj)(obj)
+        rows = obj if isinstance(obj, list) else list(obj)
+        if not rows:
+            return []
+        dump = self.dump_function(rows[0])
+        return [dump(row) for row in rows]
+
+    def dump_function(self, obj):
+        return self.dump_mapping if isinstance(obj, dict) else self.dump_object
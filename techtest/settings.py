@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,14 +40,17 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'techtest.articles',
     'techtest.regions',
-    'techtest.authors'
+    'techtest.authors',
+    'techtest.changes',
 ]
 
 MIDDLEWARE = [
+    'techtest.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'techtest.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -77,12 +81,86 @@ WSGI_APPLICATION = 'techtest.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # django.db.backends.sqlite3 plus pragmas and IMMEDIATE transactions,
+        # see techtest/backends/sqlite3/base.py
+        'ENGINE': 'techtest.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open across requests instead of reconnecting
+        # (and re-running the pragmas) every time
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                # Readers no longer block the writer and vice versa
+                'journal_mode': 'WAL',
+                # Safe with WAL: a power loss can only lose the last commits
+                'synchronous': 'NORMAL',
+                'mmap_size': 256 * 2 ** 20,
+                # Negative means KiB: 64 MiB of page cache per connection
+                'cache_size': -64000,
+                # Wait up to 5s for the write lock instead of failing
+                'busy_timeout': 5000,
+            },
+        },
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# In-process by default; set TECHTEST_CACHE_DIR to share entries between
+# worker processes through the file-based backend.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if os.environ.get('TECHTEST_CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['TECHTEST_CACHE_DIR'],
+    }
+
+# Serialized detail responses (see techtest/cache.py)
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Holds the generation of the in-process region cache (see techtest/regions/cache.py)
+REGION_CACHE_ALIAS = 'default'
+# Seconds before a process reloads the regions anyway, which bounds how long
+# it misses other processes' region writes when that cache isn't shared
+REGION_CACHE_MAX_AGE = 60
+
+# data -> bytes callable used by json_response (see techtest/encoders.py)
+JSON_ENCODER = 'techtest.encoders.default_dumps'
+
+# Per-endpoint histograms served at /metrics (see techtest/metrics.py) to
+# callers sending "Authorization: Bearer <METRICS_TOKEN>" and to staff users
+METRICS_ENABLED = os.environ.get('TECHTEST_METRICS', '1') != '0'
+METRICS_TOKEN = os.environ.get('TECHTEST_METRICS_TOKEN', '')
+
+# Long-polling of GET /changes/ (see techtest/changes/log.py): the longest
+# ?wait= accepted, and how often waiters recheck for entries written by
+# other processes
+CHANGES_MAX_WAIT = 30
+CHANGES_POLL_INTERVAL = 1.0
+# The cap on servers whose workers serve one request at a time, e.g.
+# manage.py serve --threads 1
+CHANGES_BLOCKING_MAX_WAIT = 0
+
+# Threads running the ORM work of the async views (see techtest/asyncdb.py)
+ASYNC_DB_THREADS = 8
+
+# Opt-in per-request cProfile capture (see techtest/profiling.py). Outside of
+# DEBUG it needs TECHTEST_PROFILING=1, and callers need the token or staff.
+PROFILING_ENABLED = DEBUG or os.environ.get('TECHTEST_PROFILING') == '1'
+PROFILING_TOKEN = os.environ.get('TECHTEST_PROFILING_TOKEN', '')
+PROFILING_DIR = os.environ.get('TECHTEST_PROFILING_DIR', str(BASE_DIR / 'profiles'))
+PROFILING_KEEP = 50
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
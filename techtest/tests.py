@@ -0,0 +1,470 @@
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.module_loading import import_string
+
+from techtest import api_settings, api_urls, asgi_settings, urls
+from techtest.articles.models import Article
+from techtest.authors.models import Author
+from techtest.backends.sqlite3.base import DatabaseWrapper
+from techtest.encoders import default_dumps, orjson, orjson_dumps, stdlib_dumps
+from techtest.metrics import registry
+from techtest.profiling import load_profile, profile_ids
+from techtest.regions.cache import region_cache
+from techtest.regions.models import Region
+from techtest.utils import json_encoder
+
+
+# For the serve tests: no database, just the worker's pid and whether it
+# serves one request at a time
+SERVE_SETTINGS = """
+import os
+
+from techtest.settings import *
+from techtest.workers import BLOCKING_WORKER
+
+WSGI_APPLICATION = 'serve_settings.application'
+
+
+def application(environ, start_response):
+    blocking = str(environ.get(BLOCKING_WORKER, False))
+    start_response('200 OK', [('Content-Type', 'text/plain'), ('X-Blocking', blocking)])
+    return [str(os.getpid()).encode()]
+"""
+
+
+class BatchViewTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse("batch")
+        self.author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.region = Region.objects.create(code="AL", name="Albania")
+        self.article_1 = Article.objects.create(title="Fake Article 1", author=self.author)
+        self.article_1.regions.set([self.region])
+        self.article_2 = Article.objects.create(title="Fake Article 2", content="Lorem Ipsum")
+
+    def post(self, payload):
+        return self.client.post(
+            self.url, data=json.dumps(payload), content_type="application/json"
+        )
+
+    def test_returns_objects_in_requested_order_and_reports_missing_ids(self):
+        missing_id = self.article_2.id + 100
+        response = self.post(
+            {
+                "articles": [self.article_2.id, missing_id, self.article_1.id, self.article_2.id],
+                "authors": [self.author.id],
+                "regions": [self.region.id, 0],
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [article["id"] for article in data["articles"]],
+            [self.article_2.id, self.article_1.id],
+        )
+        for article in data["articles"]:
+            detail = self.client.get(reverse("article", kwargs={"article_id": article["id"]}))
+            self.assertEqual(article, detail.json())
+        self.assertEqual(
+            data["authors"],
+            [
+                {
+                    "id": self.author.id,
+                    "first_name": "Dunsin",
+                    "last_name": "TesterMan",
+                    "article_count": 1,
+                }
+            ],
+        )
+        self.assertEqual(
+            data["regions"],
+            [{"id": self.region.id, "code": "AL", "name": "Albania", "article_count": 1}],
+        )
+        self.assertEqual(
+            data["missing"], {"articles": [missing_id], "authors": [], "regions": [0]}
+        )
+
+    def test_reads_each_kind_with_one_query(self):
+        # articles, their authors, their region links; then authors; then regions
+        region_cache.snapshot()
+        with self.assertNumQueries(5):
+            self.post(
+                {
+                    "articles": [self.article_1.id, self.article_2.id],
+                    "authors": [self.author.id],
+                    "regions": [self.region.id],
+                }
+            )
+        with self.assertNumQueries(0):
+            response = self.post({"articles": []})
+        self.assertEqual(response.json(), {"articles": [], "missing": {"articles": []}})
+
+    def test_rejects_invalid_ids(self):
+        response = self.post({"articles": ["x"], "authors": list(range(1001))})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {"articles", "authors"})
+        self.assertEqual(self.post([1]).status_code, 400)
+
+
+@override_settings(ROOT_URLCONF="techtest.api_urls", MIDDLEWARE=api_settings.MIDDLEWARE)
+class ApiOnlySettingsTestCase(TestCase):
+    def test_serves_the_api_routes_without_the_admin(self):
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        Article.objects.create(title="Fake Article 1", author=author)
+        response = self.client.get(reverse("articles-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["author"]["id"], author.id)
+        response = self.client.put(
+            reverse("author", kwargs={"author_id": author.id}),
+            data=json.dumps({"first_name": "Jane", "last_name": "Doe"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get("/admin/").status_code, 404)
+
+    def test_has_the_same_routes_as_the_full_urlconf(self):
+        def routes(module):
+            return {
+                (str(pattern.pattern), pattern.name)
+                for pattern in module.urlpatterns
+                if getattr(pattern, "name", None)
+            }
+
+        self.assertEqual(routes(api_urls), routes(urls))
+
+
+@override_settings(ROOT_URLCONF=asgi_settings.ROOT_URLCONF, MIDDLEWARE=asgi_settings.MIDDLEWARE)
+class AsgiMiddlewareTestCase(SimpleTestCase):
+    async def test_runs_security_and_common_hooks_on_the_event_loop(self):
+        with mock.patch("django.utils.deprecation.sync_to_async") as hop:
+            response = await self.async_client.get("/articles")
+            self.assertEqual(response.status_code, 301)
+            self.assertEqual(response["Location"], "/articles/")
+            self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        hop.assert_not_called()
+
+
+class ServeCommandTestCase(SimpleTestCase):
+    def start_master(self, *options):
+        """Run ``manage.py serve`` on an application that answers with the
+        serving worker's pid; returns the process and the server's URL."""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, "serve_settings.py"), "w") as settings_file:
+            settings_file.write(SERVE_SETTINGS)
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        master = subprocess.Popen(
+            [sys.executable, "manage.py", "serve", "--bind", f"127.0.0.1:{port}", *options],
+            cwd=settings.BASE_DIR,
+            env=dict(
+                os.environ,
+                DJANGO_SETTINGS_MODULE="serve_settings",
+                PYTHONPATH=os.pathsep.join([directory, str(settings.BASE_DIR)]),
+            ),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.addCleanup(master.wait)
+        self.addCleanup(master.kill)
+        url = f"http://127.0.0.1:{port}/"
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                self.worker_pid(url)
+                return master, url
+            except OSError:
+                if time.monotonic() > deadline or master.poll() is not None:
+                    raise
+                time.sleep(0.1)
+
+    def worker_pid(self, url):
+        with urlopen(url, timeout=10) as response:
+            return int(response.read())
+
+    def wait_for_exit(self, pid, timeout=10):
+        # Signal 0 fails once the master has reaped the worker
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                os.kill(pid, 0)
+            except ProcessLookupError:
+                return
+            time.sleep(0.05)
+        self.fail(f"Worker {pid} is still running")
+
+    def test_warns_about_per_process_caches_and_metrics_with_several_workers(self):
+        stderr = StringIO()
+        with mock.patch("techtest.articles.management.commands.serve.Server") as server:
+            call_command("serve", "--workers", "2", stdout=StringIO(), stderr=stderr)
+        options = server.call_args[0][0]
+        self.assertEqual(options["workers"], 2)
+        self.assertTrue(options["preload_app"])
+        server.return_value.run.assert_called_once()
+        self.assertIn("REGION_CACHE_MAX_AGE", stderr.getvalue())
+        self.assertIn("PROMETHEUS_MULTIPROC_DIR", stderr.getvalue())
+
+    def test_marks_requests_blocking_on_single_threaded_workers(self):
+        for threads, blocking in (("1", "True"), ("4", "False")):
+            master, url = self.start_master("--workers", "1", "--threads", threads)
+            with urlopen(url, timeout=10) as response:
+                self.assertEqual(response.headers["X-Blocking"], blocking)
+            master.send_signal(signal.SIGTERM)
+            self.assertEqual(master.wait(timeout=10), 0)
+
+    def test_replaces_workers_after_max_requests(self):
+        master, url = self.start_master("--workers", "2", "--max-requests", "1")
+        # A retiring worker still answers the connections it has accepted
+        pids = set()
+        for _ in range(20):
+            pids.add(self.worker_pid(url))
+            if len(pids) == 4:
+                break
+        self.assertEqual(len(pids), 4)
+        master.send_signal(signal.SIGTERM)
+        self.assertEqual(master.wait(timeout=10), 0)
+
+    def test_restarts_workers_on_hup_and_stops_on_term(self):
+        master, url = self.start_master("--workers", "1")
+        old = self.worker_pid(url)
+        master.send_signal(signal.SIGHUP)
+        self.wait_for_exit(old)
+        self.assertNotEqual(self.worker_pid(url), old)
+        master.send_signal(signal.SIGTERM)
+        self.assertEqual(master.wait(timeout=10), 0)
+
+
+# For the multiprocess metrics test: one worker recording a request, exiting,
+# or rendering /metrics
+MULTIPROCESS_SCRIPT = """
+import os
+import sys
+
+import django
+
+django.setup()
+
+from techtest.metrics import mark_process_dead, registry
+
+if sys.argv[1] == 'record':
+    labels = ('articles-list', 'GET')
+    registry.record(labels, 200, {'techtest_request_duration_seconds': 0.01})
+    print(os.getpid())
+elif sys.argv[1] == 'exit':
+    mark_process_dead(int(sys.argv[2]))
+else:
+    print(registry.render().decode())
+"""
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self):
+        registry.clear()
+        # Loaded by whichever test runs first otherwise, which shifts the counts
+        region_cache.snapshot()
+        author = Author.objects.create(first_name="Dunsin", last_name="TesterMan")
+        self.article = Article.objects.create(title="Fake Article 1", author=author)
+
+    def test_records_per_endpoint_histograms(self):
+        self.client.get(reverse("articles-list"))
+        self.client.get(reverse("articles-list"))
+        self.client.get(reverse("article", kwargs={"article_id": 0}))
+        labels = ("articles-list", "GET")
+        self.assertEqual(registry.value("techtest_request_duration_seconds_count", labels), 2)
+        # Validator, articles, authors and regions on each request
+        self.assertEqual(registry.value("techtest_request_db_queries_sum", labels), 8)
+        self.assertGreater(registry.value("techtest_serialization_duration_seconds_sum", labels), 0)
+        self.assertEqual(
+            registry.value("techtest_responses_total", ("article", "GET"), status="404"), 1
+        )
+
+    def test_labels_unknown_methods_as_other(self):
+        for method in ("FOO1", "FOO2"):
+            self.client.generic(method, reverse("articles-list"))
+        self.assertEqual(
+            registry.value("techtest_responses_total", ("articles-list", "other"), status="405"), 2
+        )
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_serves_metrics_to_token_holders_and_staff_only(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer guess")
+        self.assertEqual(response.status_code, 403)
+        staff = User.objects.create_user("staff", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_serves_prometheus_text(self):
+        self.client.get(reverse("articles-list"))
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        text = response.content.decode()
+        self.assertIn("# TYPE techtest_request_duration_seconds histogram", text)
+        self.assertIn(
+            'techtest_responses_total{method="GET",status="200",view="articles-list"} 1.0', text
+        )
+        self.assertNotIn('view="metrics"', text)
+
+    def test_sums_the_processes_sharing_a_multiprocess_dir(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        def run(*args):
+            return subprocess.run(
+                [sys.executable, "-c", MULTIPROCESS_SCRIPT, *args],
+                cwd=settings.BASE_DIR,
+                env=dict(
+                    os.environ,
+                    DJANGO_SETTINGS_MODULE="techtest.settings",
+                    PROMETHEUS_MULTIPROC_DIR=directory,
+                ),
+                stdout=subprocess.PIPE,
+                check=True,
+                text=True,
+            ).stdout
+
+        # Two workers, the first of which has exited
+        pid = int(run("record"))
+        run("exit", str(pid))
+        run("record")
+        text = run("render")
+        self.assertIn(
+            'techtest_responses_total{method="GET",status="200",view="articles-list"} 2.0', text
+        )
+        self.assertIn(
+            'techtest_request_duration_seconds_count{method="GET",view="articles-list"} 2.0', text
+        )
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        overrides = override_settings(
+            PROFILING_ENABLED=True,
+            PROFILING_TOKEN="secret",
+            PROFILING_DIR=self.directory.name,
+            PROFILING_KEEP=2,
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.url = reverse("articles-list")
+        Article.objects.create(title="Fake Article 1")
+
+    def test_profiles_authorized_requests(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE="secret")
+        self.assertEqual(response.status_code, 200)
+        profile_id = response["X-Profile-Id"]
+        self.assertEqual(profile_ids(), [profile_id])
+        self.assertEqual(load_profile(profile_id)["view"], "articles-list")
+        with open(os.path.join(self.directory.name, profile_id + ".collapsed")) as f:
+            stacks = f.read().splitlines()
+        self.assertTrue(any("dump_rows (views.py" in stack for stack in stacks))
+        self.assertTrue(all(stack.rsplit(" ", 1)[1].isdigit() for stack in stacks))
+        response = self.client.get(self.url, {"profile": "secret"})
+        self.assertIn("X-Profile-Id", response)
+
+    def test_ignores_unauthorized_requests(self):
+        response = self.client.get(self.url, HTTP_X_PROFILE="guess")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(profile_ids(), [])
+
+    def test_keeps_only_the_newest_profiles(self):
+        ids = [self.client.get(self.url, HTTP_X_PROFILE="secret")["X-Profile-Id"] for _ in range(3)]
+        self.assertEqual(profile_ids(), ids[1:])
+        self.assertEqual(len(os.listdir(self.directory.name)), 6)
+
+    def test_command_lists_and_summarizes_profiles(self):
+        profile_id = self.client.get(self.url, HTTP_X_PROFILE="secret")["X-Profile-Id"]
+        out = StringIO()
+        call_command("profiles", stdout=out)
+        self.assertIn(f"{profile_id}", out.getvalue())
+        self.assertIn("GET /articles/", out.getvalue())
+        out = StringIO()
+        call_command("profiles", profile_id, "--limit", "5", stdout=out)
+        self.assertIn("function calls", out.getvalue())
+
+
+class JsonEncoderTestCase(TestCase):
+    def test_encoders_agree(self):
+        data = {"title": "Ü", "errors": {0: {"title": ["Required."]}}, "ids": [1, 2]}
+        self.assertEqual(
+            stdlib_dumps(data),
+            b'{"title":"\\u00dc","errors":{"0":{"title":["Required."]}},"ids":[1,2]}',
+        )
+        if orjson is not None:
+            self.assertEqual(json.loads(orjson_dumps(data)), json.loads(stdlib_dumps(data)))
+
+    @override_settings(JSON_ENCODER="techtest.encoders.stdlib_dumps")
+    def test_json_response_uses_the_configured_encoder(self):
+        Article.objects.create(title="Fake Article 1")
+        with mock.patch("techtest.encoders.stdlib_dumps", wraps=stdlib_dumps) as dumps:
+            response = self.client.get(reverse("articles-list"))
+        dumps.assert_called_once()
+        self.assertEqual(response.content, stdlib_dumps(response.json()))
+
+    def test_resolves_the_encoder_once_per_setting(self):
+        with mock.patch("techtest.utils.import_string", wraps=import_string) as resolve:
+            with override_settings(JSON_ENCODER="techtest.encoders.stdlib_dumps"):
+                self.assertIs(json_encoder(), stdlib_dumps)
+                self.assertIs(json_encoder(), stdlib_dumps)
+            self.assertIs(json_encoder(), default_dumps)
+        self.assertEqual(resolve.call_count, 2)
+
+
+class SQLiteBackendTestCase(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.name = os.path.join(directory.name, "db.sqlite3")
+
+    def connect(self, **pragmas):
+        options = dict(connection.settings_dict["OPTIONS"])
+        options["pragmas"] = dict(options["pragmas"], **pragmas)
+        settings_dict = dict(connection.settings_dict, NAME=self.name, OPTIONS=options)
+        wrapper = DatabaseWrapper(settings_dict, alias="sqlite-backend-test")
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_new_connections_get_the_configured_pragmas(self):
+        wrapper = self.connect()
+        pragmas = {
+            name: wrapper.connection.execute(f"PRAGMA {name}").fetchone()[0]
+            for name in ("journal_mode", "synchronous", "cache_size", "busy_timeout")
+        }
+        self.assertEqual(
+            pragmas,
+            {"journal_mode": "wal", "synchronous": 1, "cache_size": -64000, "busy_timeout": 5000},
+        )
+        self.assertTrue(wrapper.is_usable())
+        wrapper.connection.close()
+        self.assertFalse(wrapper.is_usable())
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        writer = self.connect()
+        other = self.connect(busy_timeout=0)
+        writer._start_transaction_under_autocommit()
+        self.addCleanup(writer.connection.rollback)
+        with self.assertRaisesMessage(OperationalError, "database is locked"):
+            other._start_transaction_under_autocommit()
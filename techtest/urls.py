@@ -16,16 +16,29 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
-from techtest.articles.views import ArticleView, ArticlesListView
+from techtest.articles.views import (
+    ArticleView,
+    ArticlesBulkView,
+    ArticlesListView,
+    ArticlesSearchView,
+)
 from techtest.regions.views import RegionView, RegionsListView
 from techtest.authors.views import AuthorView, AuthorsListView
+from techtest.batch import BatchView
+from techtest.changes.views import ChangesView
+from techtest.metrics import MetricsView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("articles/", ArticlesListView.as_view(), name="articles-list"),
+    path("articles/search/", ArticlesSearchView.as_view(), name="articles-search"),
+    path("articles/bulk/", ArticlesBulkView.as_view(), name="articles-bulk"),
     path("articles/<int:article_id>/", ArticleView.as_view(), name="article"),
     path("regions/", RegionsListView.as_view(), name="regions-list"),
     path("regions/<int:region_id>/", RegionView.as_view(), name="region"),
     path("authors/", AuthorsListView.as_view(), name="authors-list"),
     path("authors/<int:author_id>/", AuthorView.as_view(), name="author"),
+    path("batch/", BatchView.as_view(), name="batch"),
+    path("changes/", ChangesView.as_view(), name="changes"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
@@ -1,8 +1,80 @@
 import json
-from django.http.response import HttpResponse
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http.response import HttpResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from marshmallow import ValidationError
+
+from techtest.metrics import serializing
+from techtest.serializers import get_schema
+
+
+@lru_cache(maxsize=None)
+def json_encoder():
+    """The ``data -> bytes`` callable named by ``settings.JSON_ENCODER``, resolved once."""
+    return import_string(settings.JSON_ENCODER)
+
+
+@receiver(setting_changed)
+def reset_json_encoder(setting, **kwargs):
+    if setting == "JSON_ENCODER":
+        json_encoder.cache_clear()
 
 
 def json_response(data={}, status=200):
     return HttpResponse(
-        content=json.dumps(data), status=status, content_type="application/json"
+        content=serializing(json_encoder(), data), status=status, content_type="application/json"
     )
+
+
+def ndjson_response(chunks, status=200):
+    """Stream an iterable of row lists as newline-delimited JSON, one chunk at a time."""
+    lines = ("".join(json.dumps(row) + "\n" for row in chunk) for chunk in chunks)
+    return StreamingHttpResponse(lines, status=status, content_type="application/x-ndjson")
+
+
+def requested_fields(request, schema_class):
+    """Parse ``?fields=a,b`` into an ``only`` tuple for ``schema_class``.
+
+    Returns None, meaning every field, when the parameter is absent or names
+    every field. The tuple is deduplicated and in the schema's field order, as
+    it keys the schema and dumper caches.
+    """
+    value = request.GET.get("fields")
+    if value is None:
+        return None
+    names = {name for name in value.split(",") if name}
+    dump_fields = get_schema(schema_class).dump_fields
+    unknown = sorted(names - set(dump_fields))
+    if not names or unknown:
+        raise ValidationError(
+            {"fields": ["Unknown field(s): {}.".format(", ".join(unknown) or "(none)")]}
+        )
+    if len(names) == len(dump_fields):
+        return None
+    return tuple(name for name in dump_fields if name in names)
+
+
+def only_dumped_fields(queryset, schema):
+    """Limit the SELECT to the model columns behind the fields ``schema`` dumps."""
+    columns = {field.name for field in queryset.model._meta.concrete_fields}
+    return queryset.only(*(name for name in schema.dump_fields if name in columns))
+
+
+def dumped_values(queryset, schema, *extra):
+    """``queryset.values()`` limited to the columns behind the fields ``schema``
+    dumps, plus the primary key and any ``extra`` names.
+
+    The rows are plain dicts, which compiled dumpers serialize without ever
+    building model instances.
+    """
+    # Relations are left to the caller, which knows how to stitch them in
+    columns = {
+        field.name for field in queryset.model._meta.concrete_fields if not field.is_relation
+    }
+    names = [queryset.model._meta.pk.attname]
+    names += [name for name in schema.dump_fields if name in columns and name not in names]
+    return queryset.values(*names, *extra)
@@ -0,0 +1,15 @@
+"""What the views may know about the server process running them."""
+
+# WSGI environ key set on every request by servers whose workers handle one
+# request at a time, so a request held open ties up a whole worker
+BLOCKING_WORKER = "techtest.blocking_worker"
+
+
+def blocking(application):
+    """Wrap a WSGI application to set ``BLOCKING_WORKER`` on its requests."""
+
+    def wrapper(environ, start_response):
+        environ[BLOCKING_WORKER] = True
+        return application(environ, start_response)
+
+    return wrapper
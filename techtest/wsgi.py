@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'techtest.settings')
 
 application = get_wsgi_application()
+
+# Load the region lookup table before the first request (and before a
+# pre-forking server copies this process)
+from techtest.regions.cache import region_cache  # noqa: E402
+
+region_cache.warm()